@@ -49,7 +49,7 @@ Use o widget de formulário quando apropriado.
 
 ### 3. Diagnóstico
 Use a tool `diagnostico_empresa` para:
-- Analisar o site da empresa
+- Analisar o site da empresa (home e páginas de serviços, sobre e preços)
 - Entender o nicho e serviços
 - Buscar contexto na web
 
@@ -64,7 +64,10 @@ Use a tool `gerar_prompts` para criar 20 prompts otimizados:
 - 2 PURCHASE (intenção de compra)
 - 1 RESEARCH (pesquisa)
 
-Mostre os prompts em um widget de lista.
+A própria tool mostra a lista ao vivo, categoria por categoria; não
+repita a lista inteira no texto.
+Os prompts de um diagnóstico que não mudou vêm do cache; só passe
+`regenerar=True` se o usuário pedir prompts novos.
 
 ### 5. Teste de Visibilidade (opcional)
 Se o usuário quiser, use `testar_visibilidade_llm` para:
@@ -72,7 +75,14 @@ Se o usuário quiser, use `testar_visibilidade_llm` para:
 - Testar 5 prompts no Gemini
 - Calcular score de visibilidade
 
-Mostre o resultado em um widget de card.
+Passe os `concorrentes` do diagnóstico para a tool contar as menções deles
+nas mesmas respostas. Em monitoramentos com muitos prompts, use
+`apenas_mencao=True`: a resposta é cortada assim que a marca aparece.
+Em análises recorrentes, passe o `analise_id` para refazer só os testes
+desatualizados.
+
+A própria tool mostra um card ao vivo com o progresso e o score final;
+não repita a tabela no texto, apenas comente o resultado.
 
 ### 6. Próximos Passos
 Ofereça:
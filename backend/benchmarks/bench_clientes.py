@@ -0,0 +1,86 @@
+"""
+⏱️ Benchmark: cliente OpenAI por chamada vs cliente compartilhado
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_clientes --n 20
+
+Mede o custo de construir um AsyncOpenAI (sem rede) e, se OPENAI_API_KEY
+estiver definida, a latência de `models.list()` com um cliente novo por
+chamada (novo handshake TCP+TLS) contra o cliente do registro.
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import statistics
+
+from openai import AsyncOpenAI
+
+from core.clients import get_openai, fechar_clientes
+
+
+def resumo(nome: str, tempos: list) -> None:
+    tempos_ms = [t * 1000 for t in tempos]
+    print(
+        f"{nome:<28} mediana={statistics.median(tempos_ms):8.2f}ms "
+        f"média={statistics.mean(tempos_ms):8.2f}ms "
+        f"min={min(tempos_ms):8.2f}ms"
+    )
+
+
+async def por_chamada(n: int) -> list:
+    tempos = []
+    for _ in range(n):
+        inicio = time.perf_counter()
+        async with AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY")) as client:
+            await client.models.list()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+async def compartilhado(n: int) -> list:
+    client = get_openai()
+    await client.models.list()  # aquece o pool
+
+    tempos = []
+    for _ in range(n):
+        inicio = time.perf_counter()
+        await client.models.list()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def construcao(n: int) -> list:
+    tempos = []
+    for _ in range(n):
+        inicio = time.perf_counter()
+        AsyncOpenAI(api_key="sk-benchmark")
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+async def main(n: int) -> None:
+    resumo("construção AsyncOpenAI", construcao(n))
+
+    if not os.getenv("OPENAI_API_KEY"):
+        print("OPENAI_API_KEY não definida: pulando medições de rede.")
+        return
+
+    try:
+        novo = await por_chamada(n)
+        pool = await compartilhado(n)
+    finally:
+        await fechar_clientes()
+
+    resumo("cliente novo por chamada", novo)
+    resumo("cliente compartilhado", pool)
+    economia = statistics.median(novo) - statistics.median(pool)
+    print(f"economia por chamada (mediana): {economia * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.n))
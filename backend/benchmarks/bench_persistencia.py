@@ -0,0 +1,93 @@
+"""
+⏱️ Benchmark: round trips para salvar uma análise e testes de visibilidade
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_persistencia --latencia 50 --testes 30
+
+Contra um PostgREST falso local (cada resposta demora `--latencia` ms),
+conta requisições e mede o tempo de:
+
+    análise (antigo)     1 insert da análise + 1 insert por prompt
+    análise (lote)       insert da análise + prompts num insert só
+    análise (rpc)        função salvar_analise: tudo numa transação
+    testes (um a um)     `--testes` chamadas a save_teste_visibilidade
+    testes (lote)        uma chamada a save_testes_visibilidade
+"""
+
+import time
+import uuid
+import asyncio
+import argparse
+
+from store.supabase_store import SupabaseStore
+from benchmarks.bench_store import servidor_falso, CHAVE_FALSA
+
+
+PROMPTS = [
+    {"ordem": i, "texto": f"Prompt {i}", "categoria": "UNBRANDED", "intent": "informacional",
+     "persona": "", "formato_esperado": "lista"}
+    for i in range(1, 21)
+]
+
+
+def responder_com_rpc(rpc: bool):
+    def responder(metodo, caminho, corpo):
+        if "/rpc/" in caminho:
+            if not rpc:
+                return 404, {"code": "PGRST202", "message": "Could not find the function", "details": None, "hint": None}
+            return str(uuid.uuid4())
+        # Insert: uma linha com id para cada linha enviada
+        linhas = corpo if isinstance(corpo, list) else [corpo]
+        return [{**linha, "id": str(uuid.uuid4())} for linha in linhas]
+    return responder
+
+
+async def medir(nome: str, servidor, operacao) -> None:
+    antes = servidor.requisicoes
+    inicio = time.perf_counter()
+    await operacao()
+    decorrido = time.perf_counter() - inicio
+    print(f"{nome:<20} requisições={servidor.requisicoes - antes:4d} tempo={decorrido * 1000:9.2f}ms")
+
+
+async def main(latencia_ms: float, testes: int) -> None:
+    latencia = latencia_ms / 1000
+    com_rpc = servidor_falso(latencia, responder_com_rpc(True))
+    sem_rpc = servidor_falso(latencia, responder_com_rpc(False))
+
+    store = SupabaseStore(f"http://127.0.0.1:{com_rpc.server_address[1]}", CHAVE_FALSA)
+    store_sem_rpc = SupabaseStore(f"http://127.0.0.1:{sem_rpc.server_address[1]}", CHAVE_FALSA)
+    # Cria os clientes e descobre que o segundo banco não tem a função
+    await store.save_analise("t1", "Empresa", "https://empresa.com", {}, PROMPTS)
+    await store_sem_rpc.save_analise("t1", "Empresa", "https://empresa.com", {}, PROMPTS)
+
+    async def analise_antiga():
+        result = await store._executar(lambda c: c.table("analises").insert({"empresa": "Empresa"}).execute())
+        analise_id = result.data[0]["id"]
+        for prompt in PROMPTS:
+            await store._executar(lambda c: c.table("prompts").insert({**prompt, "analise_id": analise_id}).execute())
+
+    async def testes_um_a_um():
+        for i in range(testes):
+            await store.save_teste_visibilidade(f"a{i}", {"score_geral": i})
+
+    async def testes_lote():
+        await store.save_testes_visibilidade([(f"a{i}", {"score_geral": i}) for i in range(testes)])
+
+    try:
+        await medir("análise (antigo)", com_rpc, analise_antiga)
+        await medir("análise (lote)", sem_rpc, lambda: store_sem_rpc.save_analise("t1", "Empresa", "https://empresa.com", {}, PROMPTS))
+        await medir("análise (rpc)", com_rpc, lambda: store.save_analise("t1", "Empresa", "https://empresa.com", {}, PROMPTS))
+        await medir("testes (um a um)", com_rpc, testes_um_a_um)
+        await medir("testes (lote)", com_rpc, testes_lote)
+    finally:
+        com_rpc.shutdown()
+        sem_rpc.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latencia", type=float, default=50, help="latência de cada requisição (ms)")
+    parser.add_argument("--testes", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.latencia, args.testes))
@@ -0,0 +1,53 @@
+from .fanout import FanOut, Tarefa, ResultadoTarefa
+from .cache import TieredCache, get_cache, chave_cache, estatisticas_caches
+from .mencoes import MentionMatcher, criar_matcher
+from .urls import normalizar_url
+from .html_head import LeitorHead
+from .extrator import LeitorConteudo, extrair_local
+from .crawler import Crawler, PaginaRastreada
+from .singleflight import SingleFlight, get_singleflight, estatisticas_singleflight
+from .serper import buscar, buscar_lote
+from .biblioteca import BibliotecaPrompts, get_biblioteca
+from .rate_limit import LimitadorAdaptativo, get_limitador, com_retentativas
+from .clients import (
+    get_openai,
+    get_gemini,
+    get_http,
+    estatisticas_pools,
+    iniciar_clientes,
+    fechar_clientes
+)
+
+__all__ = [
+    "FanOut",
+    "Tarefa",
+    "ResultadoTarefa",
+    "TieredCache",
+    "get_cache",
+    "chave_cache",
+    "estatisticas_caches",
+    "MentionMatcher",
+    "criar_matcher",
+    "normalizar_url",
+    "LeitorHead",
+    "LeitorConteudo",
+    "extrair_local",
+    "Crawler",
+    "PaginaRastreada",
+    "SingleFlight",
+    "get_singleflight",
+    "estatisticas_singleflight",
+    "buscar",
+    "buscar_lote",
+    "BibliotecaPrompts",
+    "get_biblioteca",
+    "LimitadorAdaptativo",
+    "get_limitador",
+    "com_retentativas",
+    "get_openai",
+    "get_gemini",
+    "get_http",
+    "estatisticas_pools",
+    "iniciar_clientes",
+    "fechar_clientes"
+]
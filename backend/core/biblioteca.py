@@ -0,0 +1,321 @@
+"""
+📚 Biblioteca de prompts por nicho, com índice de quase-duplicatas (MinHash/LSH)
+"""
+
+import os
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import threading
+from collections import defaultdict
+from typing import Optional
+
+from .texto import sem_acentos
+
+
+BIBLIOTECA_PATH = os.getenv("HARPIA_BIBLIOTECA_PATH", ".cache/biblioteca.sqlite3")
+# Quantas empresas diferentes precisam ter gerado o prompt para ele ser "provado"
+BIBLIOTECA_MIN_USOS = int(os.getenv("BIBLIOTECA_MIN_USOS", "2"))
+# Fração de cada categoria que continua sendo gerada mesmo com a
+# biblioteca cheia, para ela se renovar
+BIBLIOTECA_FRACAO_NOVOS = float(os.getenv("BIBLIOTECA_FRACAO_NOVOS", "0.4"))
+# Similaridade (Jaccard estimada) a partir da qual dois prompts são o mesmo
+BIBLIOTECA_LIMIAR_DUPLICATA = float(os.getenv("BIBLIOTECA_LIMIAR_DUPLICATA", "0.7"))
+
+# Só categorias sem marca: servem para qualquer empresa do nicho
+CATEGORIAS_BIBLIOTECA = ("UNBRANDED", "PROBLEM", "RESEARCH")
+
+# 64 permutações em 16 bandas de 4: pares com Jaccard ~0.5 já viram candidatos
+NUM_PERMUTACOES = 64
+BANDAS = 16
+TAMANHO_SHINGLE = 5
+
+_PRIMO = (1 << 61) - 1
+
+
+class MinHash:
+    """
+    Assinatura MinHash de um texto sobre shingles de caracteres (texto
+    normalizado: minúsculo, sem acento, espaços simples).
+
+    Ex:
+        mh = MinHash()
+        mh.similaridade(mh.assinatura("O que é GEO?"), mh.assinatura("o que é geo"))  # ~1.0
+    """
+
+    def __init__(self, num_permutacoes: int = NUM_PERMUTACOES, semente: int = 42):
+        # Semente fixa: assinaturas guardadas continuam comparáveis entre processos
+        aleatorio = random.Random(semente)
+        self._coeficientes = [
+            (aleatorio.randrange(1, _PRIMO), aleatorio.randrange(0, _PRIMO))
+            for _ in range(num_permutacoes)
+        ]
+
+    def assinatura(self, texto: str) -> list:
+        texto = normalizar_texto(texto)
+        if len(texto) <= TAMANHO_SHINGLE:
+            shingles = {texto}
+        else:
+            shingles = {texto[i:i + TAMANHO_SHINGLE] for i in range(len(texto) - TAMANHO_SHINGLE + 1)}
+
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+            for s in shingles
+        ]
+        return [min((a * h + b) % _PRIMO for h in hashes) for a, b in self._coeficientes]
+
+    @staticmethod
+    def similaridade(a: list, b: list) -> float:
+        """Fração de posições iguais: estimativa do Jaccard dos shingles."""
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class IndiceLSH:
+    """
+    Índice LSH por bandas: prompts cujas assinaturas coincidem em alguma
+    banda inteira viram candidatos a quase-duplicata.
+    """
+
+    def __init__(self, bandas: int = BANDAS):
+        self.bandas = bandas
+        self._baldes: dict = defaultdict(set)
+
+    def _chaves(self, assinatura: list) -> list:
+        linhas = len(assinatura) // self.bandas
+        return [(i, tuple(assinatura[i * linhas:(i + 1) * linhas])) for i in range(self.bandas)]
+
+    def adicionar(self, item_id: int, assinatura: list) -> None:
+        for chave in self._chaves(assinatura):
+            self._baldes[chave].add(item_id)
+
+    def candidatos(self, assinatura: list) -> set:
+        encontrados = set()
+        for chave in self._chaves(assinatura):
+            encontrados |= self._baldes.get(chave, set())
+        return encontrados
+
+
+class BibliotecaPrompts:
+    """
+    Prompts sem marca já gerados, guardados por nicho e categoria em
+    SQLite. Cada prompt conta quantas empresas diferentes o geraram
+    (`usos`, com um hash por empresa em `usos_empresa`): uma empresa que
+    regera os próprios prompts não os prova sozinha. Prompts novos que
+    são quase-duplicatas de um existente somam uso nele em vez de entrar
+    de novo.
+
+    Uso:
+        biblioteca = get_biblioteca()
+        prontos = biblioteca.sugerir("fintech", "PROBLEM", 4)
+        canonicos = biblioteca.registrar("fintech", prompts_gerados, empresa="Datarisk")
+    """
+
+    def __init__(self, caminho: str = BIBLIOTECA_PATH):
+        self.minhash = MinHash()
+        self._lock = threading.Lock()
+        self._indices: dict = {}
+
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS prompts (
+                id INTEGER PRIMARY KEY,
+                nicho TEXT NOT NULL,
+                categoria TEXT NOT NULL,
+                texto TEXT NOT NULL,
+                intent TEXT,
+                persona TEXT,
+                formato_esperado TEXT,
+                assinatura TEXT NOT NULL,
+                usos INTEGER NOT NULL DEFAULT 1,
+                atualizado_em REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS prompts_nicho ON prompts (nicho, categoria, usos)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS usos_empresa (
+                prompt_id INTEGER NOT NULL,
+                empresa TEXT NOT NULL,
+                PRIMARY KEY (prompt_id, empresa)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def sugerir(
+        self,
+        nicho: str,
+        categoria: str,
+        quantidade: int,
+        min_usos: int = BIBLIOTECA_MIN_USOS
+    ) -> list:
+        """
+        Prompts provados (gerados por ao menos `min_usos` empresas) do
+        nicho e categoria, os mais usados primeiro. Retorna no máximo `quantidade`.
+        """
+        with self._lock:
+            linhas = self._conn.execute(
+                """
+                SELECT texto, intent, persona, formato_esperado FROM prompts
+                WHERE nicho = ? AND categoria = ? AND usos >= ?
+                ORDER BY usos DESC, atualizado_em DESC LIMIT ?
+                """,
+                (normalizar_texto(nicho), categoria, min_usos, quantidade)
+            ).fetchall()
+
+        return [
+            {
+                "texto": texto,
+                "categoria": categoria,
+                "intent": intent or "informacional",
+                "persona": persona or "",
+                "formato_esperado": formato_esperado or "explicacao"
+            }
+            for texto, intent, persona, formato_esperado in linhas
+        ]
+
+    def registrar(self, nicho: str, prompts: list, empresa: str = "") -> list:
+        """
+        Registra os prompts sem marca de uma análise. Quase-duplicatas de
+        prompts da biblioteca somam um uso (se a empresa ainda não tinha
+        gerado aquele prompt) e voltam com o texto canônico,
+        para que análises diferentes testem exatamente o mesmo prompt (e
+        compartilhem o cache de respostas das LLMs).
+
+        Returns:
+            `prompts` na mesma ordem, com `texto` canônico onde houve
+            quase-duplicata
+        """
+        nicho = normalizar_texto(nicho)
+        marca = normalizar_texto(empresa)
+        id_empresa = hashlib.sha256(marca.encode()).hexdigest()[:16]
+        agora = time.time()
+        usados = set()
+        saida = []
+
+        with self._lock:
+            indice, assinaturas = self._indice(nicho)
+
+            for prompt in prompts:
+                texto = prompt.get("texto", "")
+                categoria = prompt.get("categoria")
+                # Prompt que cita a empresa não serve para o resto do nicho
+                if categoria not in CATEGORIAS_BIBLIOTECA or not texto or (marca and marca in normalizar_texto(texto)):
+                    saida.append(prompt)
+                    continue
+
+                assinatura = self.minhash.assinatura(texto)
+                existente = self._mais_parecido(nicho, categoria, assinatura, indice, assinaturas)
+
+                if existente is not None:
+                    item_id, texto_canonico = existente
+                    # Duas quase-duplicatas na mesma análise: a segunda fica
+                    # como veio, para o conjunto não ter prompts repetidos
+                    if item_id in usados:
+                        saida.append(prompt)
+                        continue
+
+                    nova_empresa = self._conn.execute(
+                        "INSERT OR IGNORE INTO usos_empresa (prompt_id, empresa) VALUES (?, ?)",
+                        (item_id, id_empresa)
+                    ).rowcount
+                    if nova_empresa:
+                        self._conn.execute(
+                            "UPDATE prompts SET usos = usos + 1, atualizado_em = ? WHERE id = ?",
+                            (agora, item_id)
+                        )
+                    usados.add(item_id)
+                    saida.append({**prompt, "texto": texto_canonico})
+                    continue
+
+                cursor = self._conn.execute(
+                    """
+                    INSERT INTO prompts (nicho, categoria, texto, intent, persona, formato_esperado, assinatura, usos, atualizado_em)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+                    """,
+                    (
+                        nicho, categoria, texto, prompt.get("intent"), prompt.get("persona"),
+                        prompt.get("formato_esperado"), json.dumps(assinatura), agora
+                    )
+                )
+                self._conn.execute(
+                    "INSERT INTO usos_empresa (prompt_id, empresa) VALUES (?, ?)",
+                    (cursor.lastrowid, id_empresa)
+                )
+                indice.adicionar(cursor.lastrowid, assinatura)
+                assinaturas[cursor.lastrowid] = (categoria, assinatura)
+                usados.add(cursor.lastrowid)
+                saida.append(prompt)
+
+            self._conn.commit()
+
+        return saida
+
+    def _mais_parecido(self, nicho: str, categoria: str, assinatura: list, indice: IndiceLSH, assinaturas: dict) -> Optional[tuple]:
+        melhor, melhor_similaridade = None, BIBLIOTECA_LIMIAR_DUPLICATA
+        for item_id in indice.candidatos(assinatura):
+            categoria_item, assinatura_item = assinaturas[item_id]
+            if categoria_item != categoria:
+                continue
+            similaridade = self.minhash.similaridade(assinatura, assinatura_item)
+            if similaridade >= melhor_similaridade:
+                melhor, melhor_similaridade = item_id, similaridade
+
+        if melhor is None:
+            return None
+
+        texto = self._conn.execute("SELECT texto FROM prompts WHERE id = ?", (melhor,)).fetchone()[0]
+        return melhor, texto
+
+    def _indice(self, nicho: str) -> tuple:
+        """
+        Índice LSH do nicho, montado das assinaturas guardadas na
+        primeira vez que o nicho é usado no processo.
+        """
+        if nicho not in self._indices:
+            indice, assinaturas = IndiceLSH(), {}
+            linhas = self._conn.execute(
+                "SELECT id, categoria, assinatura FROM prompts WHERE nicho = ?", (nicho,)
+            )
+            for item_id, categoria, assinatura in linhas:
+                assinatura = json.loads(assinatura)
+                indice.adicionar(item_id, assinatura)
+                assinaturas[item_id] = (categoria, assinatura)
+            self._indices[nicho] = (indice, assinaturas)
+        return self._indices[nicho]
+
+
+def quantos_da_biblioteca(quantidade: int, fracao_novos: float = BIBLIOTECA_FRACAO_NOVOS) -> int:
+    """
+    Quantos prompts de uma categoria podem vir da biblioteca; o resto é
+    gerado. Arredondamento aleatório dos novos (`quantidade *
+    fracao_novos`, na média): categorias de um prompt só também se
+    renovam, numa fração das análises.
+    """
+    novos = quantidade * fracao_novos
+    novos = int(novos) + (random.random() < novos - int(novos))
+    return max(0, quantidade - novos)
+
+
+def normalizar_texto(texto: str) -> str:
+    texto = sem_acentos(texto)
+    return " ".join("".join(c if c.isalnum() else " " for c in texto).split())
+
+
+_biblioteca: Optional[BibliotecaPrompts] = None
+
+
+def get_biblioteca() -> BibliotecaPrompts:
+    """Biblioteca compartilhada do processo, aberta na primeira chamada."""
+    global _biblioteca
+    if _biblioteca is None:
+        _biblioteca = BibliotecaPrompts()
+    return _biblioteca
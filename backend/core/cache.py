@@ -0,0 +1,266 @@
+"""
+🗃️ Cache em dois níveis: LRU em memória + SQLite persistente
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Optional
+
+
+CACHE_PATH = os.getenv("HARPIA_CACHE_PATH", ".cache/harpia.sqlite3")
+CACHE_PERSISTENTE = os.getenv("HARPIA_CACHE_PERSISTENTE", "true").lower() == "true"
+# De quanto em quanto tempo (s) cada namespace apaga do disco os itens expirados
+CACHE_INTERVALO_LIMPEZA = float(os.getenv("HARPIA_CACHE_INTERVALO_LIMPEZA", "3600"))
+
+
+def chave_cache(*partes: Any) -> str:
+    """
+    Gera uma chave estável (sha256) a partir de partes serializáveis em JSON.
+    """
+    bruto = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    Cache em memória com expiração por TTL e descarte do item menos usado.
+    """
+
+    def __init__(self, max_itens: int = 1024, ttl: Optional[float] = None):
+        self.max_itens = max(1, max_itens)
+        self.ttl = ttl
+        self._itens: OrderedDict = OrderedDict()
+
+    def get(self, chave: str) -> Optional[Any]:
+        item = self._itens.get(chave)
+        if item is None:
+            return None
+
+        expira_em, valor = item
+        if expira_em is not None and expira_em <= time.time():
+            del self._itens[chave]
+            return None
+
+        self._itens.move_to_end(chave)
+        return valor
+
+    def set(self, chave: str, valor: Any, ttl: Optional[float] = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl
+        expira_em = time.time() + ttl if ttl is not None else None
+
+        self._itens[chave] = (expira_em, valor)
+        self._itens.move_to_end(chave)
+
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    def delete(self, chave: str) -> None:
+        self._itens.pop(chave, None)
+
+    def clear(self) -> None:
+        self._itens.clear()
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+
+class SQLiteCache:
+    """
+    Cache persistente em SQLite, separado por namespace.
+
+    Os valores são guardados como JSON. Sobrevive a reinícios do processo.
+    Itens expirados são apagados ao abrir o namespace e depois a cada
+    CACHE_INTERVALO_LIMPEZA segundos (verificado nas escritas).
+    """
+
+    _conexoes: dict = {}
+    _lock = threading.Lock()
+
+    def __init__(self, namespace: str, ttl: Optional[float] = None, caminho: str = CACHE_PATH):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.caminho = caminho
+        self._conn = self._conectar(caminho)
+        self.limpar_expirados()
+
+    @classmethod
+    def _conectar(cls, caminho: str) -> sqlite3.Connection:
+        with cls._lock:
+            if caminho not in cls._conexoes:
+                if caminho != ":memory:":
+                    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+
+                conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS cache (
+                        namespace TEXT NOT NULL,
+                        chave TEXT NOT NULL,
+                        valor TEXT NOT NULL,
+                        expira_em REAL,
+                        PRIMARY KEY (namespace, chave)
+                    )
+                    """
+                )
+                cls._conexoes[caminho] = conn
+            return cls._conexoes[caminho]
+
+    def get(self, chave: str) -> Optional[Any]:
+        item = self.get_com_expiracao(chave)
+        return item[0] if item is not None else None
+
+    def get_com_expiracao(self, chave: str) -> Optional[tuple]:
+        """Retorna (valor, expira_em) ou None; `expira_em` None não expira."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT valor, expira_em FROM cache WHERE namespace = ? AND chave = ?",
+                (self.namespace, chave)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        valor, expira_em = row
+        if expira_em is not None and expira_em <= time.time():
+            self.delete(chave)
+            return None
+
+        return json.loads(valor), expira_em
+
+    def set(self, chave: str, valor: Any, ttl: Optional[float] = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl
+        expira_em = time.time() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, chave, valor, expira_em) VALUES (?, ?, ?, ?)",
+                (self.namespace, chave, json.dumps(valor, ensure_ascii=False, default=str), expira_em)
+            )
+
+        if time.monotonic() >= self._proxima_limpeza:
+            self.limpar_expirados()
+
+    def delete(self, chave: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND chave = ?",
+                (self.namespace, chave)
+            )
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def limpar_expirados(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expira_em IS NOT NULL AND expira_em <= ?",
+                (self.namespace, time.time())
+            )
+        self._proxima_limpeza = time.monotonic() + CACHE_INTERVALO_LIMPEZA
+        return cursor.rowcount
+
+
+@dataclass
+class CacheEstatisticas:
+    hits_memoria: int = 0
+    hits_disco: int = 0
+    misses: int = 0
+    escritas: int = 0
+
+    def to_dict(self) -> dict:
+        dados = asdict(self)
+        consultas = self.hits_memoria + self.hits_disco + self.misses
+        dados["taxa_acerto"] = round((self.hits_memoria + self.hits_disco) / consultas, 3) if consultas else 0
+        return dados
+
+
+class TieredCache:
+    """
+    LRU em memória na frente de um SQLiteCache.
+
+    Acertos no disco são promovidos para a memória com o TTL que resta
+    a eles no disco. `None` nunca é
+    guardado: um `get` que retorna `None` é sempre um miss.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: Optional[float] = None,
+        max_itens: int = 1024,
+        persistente: bool = CACHE_PERSISTENTE
+    ):
+        self.namespace = namespace
+        self.memoria = LRUCache(max_itens=max_itens, ttl=ttl)
+        self.disco = SQLiteCache(namespace, ttl=ttl) if persistente else None
+        self.stats = CacheEstatisticas()
+
+    def get(self, chave: str) -> Optional[Any]:
+        valor = self.memoria.get(chave)
+        if valor is not None:
+            self.stats.hits_memoria += 1
+            return valor
+
+        if self.disco is not None:
+            item = self.disco.get_com_expiracao(chave)
+            if item is not None:
+                valor, expira_em = item
+                self.stats.hits_disco += 1
+                restante = expira_em - time.time() if expira_em is not None else None
+                self.memoria.set(chave, valor, restante)
+                return valor
+
+        self.stats.misses += 1
+        return None
+
+    def set(self, chave: str, valor: Any, ttl: Optional[float] = None) -> None:
+        if valor is None:
+            return
+
+        self.memoria.set(chave, valor, ttl)
+        if self.disco is not None:
+            self.disco.set(chave, valor, ttl)
+        self.stats.escritas += 1
+
+    def delete(self, chave: str) -> None:
+        self.memoria.delete(chave)
+        if self.disco is not None:
+            self.disco.delete(chave)
+
+    def limpar(self) -> None:
+        """Remove todos os itens do namespace."""
+        self.memoria.clear()
+        if self.disco is not None:
+            self.disco.limpar()
+
+
+_caches: dict = {}
+
+
+def get_cache(
+    namespace: str,
+    ttl: Optional[float] = None,
+    max_itens: int = 1024,
+    persistente: bool = CACHE_PERSISTENTE
+) -> TieredCache:
+    """
+    Retorna o cache do namespace, criando na primeira chamada.
+    `persistente=False` deixa o namespace só em memória.
+    """
+    if namespace not in _caches:
+        _caches[namespace] = TieredCache(namespace, ttl=ttl, max_itens=max_itens, persistente=persistente)
+    return _caches[namespace]
+
+
+def estatisticas_caches() -> dict:
+    """Contadores de hit/miss de todos os caches do processo."""
+    return {nome: cache.stats.to_dict() for nome, cache in _caches.items()}
@@ -0,0 +1,138 @@
+"""
+🔌 Registro de clientes compartilhados (LLMs e APIs externas), criados uma vez por processo
+"""
+
+import os
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from .gemini import GeminiClient
+from .http import PoolHTTP
+
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+# Limites do pool de conexões
+POOL_MAX_CONEXOES = int(os.getenv("LLM_POOL_MAX_CONEXOES", "100"))
+POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20"))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "30"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+GEMINI_CONCORRENCIA = int(os.getenv("GEMINI_CONCORRENCIA", "32"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", "300"))
+
+# Um pool por upstream: timeout e quantas requisições simultâneas por host
+POOLS = {
+    "openai": {"timeout": LLM_TIMEOUT, "limite_por_host": POOL_MAX_CONEXOES},
+    "gemini": {"timeout": GEMINI_TIMEOUT, "limite_por_host": POOL_MAX_CONEXOES},
+    "firecrawl": {"timeout": 30.0, "limite_por_host": int(os.getenv("FIRECRAWL_CONCORRENCIA", "4"))},
+    "serper": {"timeout": 10.0, "limite_por_host": int(os.getenv("SERPER_CONCORRENCIA", "8"))},
+    # Sites de clientes: poucas conexões por host, por educação (o crawler
+    # usa o mesmo limite)
+    "sites": {"timeout": 10.0, "limite_por_host": int(os.getenv("SITES_CONCORRENCIA_POR_HOST", "6"))},
+}
+
+
+class ClientRegistry:
+    """
+    Guarda os clientes compartilhados por todas as tools.
+
+    Os clientes são criados sob demanda (ou em `iniciar`) e reaproveitados
+    entre chamadas, mantendo sessões TLS e conexões abertas.
+    """
+
+    def __init__(self):
+        self._pools: dict = {}
+        self._openai: Optional[AsyncOpenAI] = None
+        self._gemini: Optional[GeminiClient] = None
+
+    def pool(self, nome: str) -> PoolHTTP:
+        if nome not in self._pools:
+            config = POOLS[nome]
+            self._pools[nome] = PoolHTTP(
+                nome,
+                timeout=config["timeout"],
+                max_conexoes=POOL_MAX_CONEXOES,
+                max_keepalive=POOL_MAX_KEEPALIVE,
+                keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+                limite_por_host=config["limite_por_host"],
+                dns_ttl=DNS_CACHE_TTL
+            )
+        return self._pools[nome]
+
+    def http(self, nome: str) -> httpx.AsyncClient:
+        """httpx.AsyncClient compartilhado de um upstream (ex: "serper")."""
+        return self.pool(nome).client
+
+    def openai(self) -> AsyncOpenAI:
+        """Cliente AsyncOpenAI compartilhado."""
+        if self._openai is None:
+            self._openai = AsyncOpenAI(
+                api_key=OPENAI_API_KEY,
+                http_client=self.http("openai")
+            )
+        return self._openai
+
+    def gemini(self) -> GeminiClient:
+        """Cliente Gemini assíncrono compartilhado."""
+        if self._gemini is None:
+            self._gemini = GeminiClient(
+                self.http("gemini"),
+                api_key=GOOGLE_API_KEY,
+                concorrencia=GEMINI_CONCORRENCIA,
+                timeout=GEMINI_TIMEOUT
+            )
+        return self._gemini
+
+    async def iniciar(self) -> None:
+        """Cria os clientes antecipadamente (startup da aplicação)."""
+        self.openai()
+        if GOOGLE_API_KEY:
+            self.gemini()
+        for nome in ("firecrawl", "serper", "sites"):
+            self.pool(nome)
+
+    async def fechar(self) -> None:
+        """Fecha os pools de conexão (shutdown da aplicação)."""
+        if self._openai is not None:
+            await self._openai.close()
+            self._openai = None
+
+        self._gemini = None
+
+        for pool in self._pools.values():
+            await pool.fechar()
+        self._pools.clear()
+
+    def estatisticas(self) -> dict:
+        return {nome: pool.estatisticas() for nome, pool in self._pools.items()}
+
+
+registry = ClientRegistry()
+
+
+def get_openai() -> AsyncOpenAI:
+    return registry.openai()
+
+
+def get_gemini() -> GeminiClient:
+    return registry.gemini()
+
+
+def get_http(nome: str) -> httpx.AsyncClient:
+    return registry.http(nome)
+
+
+def estatisticas_pools() -> dict:
+    return registry.estatisticas()
+
+
+async def iniciar_clientes() -> None:
+    await registry.iniciar()
+
+
+async def fechar_clientes() -> None:
+    await registry.fechar()
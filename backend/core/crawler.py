@@ -0,0 +1,312 @@
+"""
+🕷️ Crawler limitado: robots.txt, sitemap.xml e páginas mais relevantes do site
+"""
+
+import os
+import re
+import gzip
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+from .clients import get_http
+from .fanout import FanOut, Tarefa
+from .texto import sem_acentos
+from .urls import normalizar_url
+
+
+CRAWLER_MAX_PAGINAS = int(os.getenv("CRAWLER_MAX_PAGINAS", "8"))
+CRAWLER_CONCORRENCIA_POR_HOST = int(os.getenv("CRAWLER_CONCORRENCIA_POR_HOST", "6"))
+CRAWLER_PRAZO = float(os.getenv("CRAWLER_PRAZO", "20"))
+CRAWLER_USER_AGENT = os.getenv("CRAWLER_USER_AGENT", "HarpiaBot")
+
+# Limites da descoberta (robots e sitemaps são baixados antes das páginas)
+DESCOBERTA_TIMEOUT = 5.0
+SITEMAP_MAX_BYTES = 2 * 1024 * 1024
+SITEMAP_MAX_ARQUIVOS = 3
+
+# Palavras no caminho da URL que indicam cada tipo de página, e o peso de cada tipo
+CATEGORIAS = {
+    "servicos": {
+        "servico", "servicos", "solucao", "solucoes", "produto", "produtos",
+        "plataforma", "funcionalidades", "recursos",
+        "service", "services", "solutions", "products", "platform", "features"
+    },
+    "sobre": {
+        "sobre", "quem", "somos", "institucional", "empresa", "historia",
+        "about", "company", "us"
+    },
+    "precos": {"precos", "preco", "planos", "pricing", "plans", "prices"},
+    "clientes": {"clientes", "cases", "casos", "customers"},
+}
+PESOS = {"servicos": 3.0, "sobre": 2.0, "precos": 2.0, "clientes": 1.0}
+
+# Seções que não descrevem a empresa (conteúdo editorial, legal, conta)
+IGNORAR = {
+    "blog", "post", "posts", "noticias", "news", "tag", "tags", "categoria",
+    "category", "autor", "author", "feed", "login", "entrar", "cadastro",
+    "carrinho", "cart", "checkout", "politica", "privacidade", "privacy",
+    "termos", "terms", "cookies", "wp-content", "wp-json", "cdn-cgi"
+}
+EXTENSOES_IGNORADAS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip",
+    ".css", ".js", ".xml", ".json", ".mp4", ".mp3"
+)
+
+# Sem sitemap: caminhos comuns tentados no lugar
+CAMINHOS_PROVAVEIS = ["/servicos", "/solucoes", "/produtos", "/sobre", "/precos"]
+
+_RE_LOC = re.compile(rb"<loc>\s*(.*?)\s*</loc>", re.IGNORECASE | re.DOTALL)
+
+
+@dataclass
+class PaginaRastreada:
+    url: str
+    categoria: Optional[str]
+    extract: Optional[dict] = None
+    erro: Optional[str] = None
+
+
+class Crawler:
+    """
+    Rastreia a home e as páginas mais prováveis de "serviços", "sobre" e
+    "preços" de um site, respeitando robots.txt, com limite de
+    concorrência por host e prazo para as páginas internas.
+
+    `extrair(url)` é a função que baixa e extrai cada página (ex:
+    `scrape_site`); o crawler só decide quais URLs visitar e quando. A
+    home pode usar outra função, `extrair_home` (ex: com fallback pago).
+
+    Uso:
+        crawler = Crawler(scrape_site, max_paginas=8)
+        paginas = await crawler.rastrear("https://datarisk.io")
+    """
+
+    def __init__(
+        self,
+        extrair: Callable[[str], Awaitable[Any]],
+        max_paginas: int = CRAWLER_MAX_PAGINAS,
+        concorrencia_por_host: int = CRAWLER_CONCORRENCIA_POR_HOST,
+        prazo: float = CRAWLER_PRAZO,
+        extrair_home: Optional[Callable[[str], Awaitable[Any]]] = None
+    ):
+        self.extrair = extrair
+        self.extrair_home = extrair_home or extrair
+        self.max_paginas = max(1, max_paginas)
+        self.concorrencia_por_host = max(1, concorrencia_por_host)
+        self.prazo = prazo
+
+    async def rastrear(self, site: str) -> list:
+        """
+        Retorna uma lista de `PaginaRastreada`, com a home primeiro e as
+        demais na ordem do ranking. Páginas internas que não terminaram
+        dentro do prazo ficam de fora; a home não tem prazo aqui (o
+        fallback dela pode levar mais, e quem chama limita o total).
+        """
+        limite = time.monotonic() + self.prazo
+        home = normalizar_url(site)
+        partes = urlsplit(home)
+        origem = f"{partes.scheme}://{partes.netloc}"
+
+        # A home não depende da descoberta: começa junto com robots/sitemap
+        tarefa_home = asyncio.create_task(self.extrair_home(home))
+
+        try:
+            robots = await ler_robots(origem)
+            candidatas = await self._descobrir(origem, home, robots)
+
+            atraso = robots.crawl_delay(CRAWLER_USER_AGENT) if robots else None
+            paginas = await self._visitar(candidatas, partes.netloc, atraso, limite)
+
+            try:
+                extract_home = await tarefa_home
+                pagina_home = PaginaRastreada(url=home, categoria="home", extract=extract_home)
+            except Exception as e:
+                pagina_home = PaginaRastreada(url=home, categoria="home", erro=str(e) or type(e).__name__)
+        finally:
+            if not tarefa_home.done():
+                tarefa_home.cancel()
+
+        return [pagina_home] + paginas
+
+    async def _descobrir(self, origem: str, home: str, robots: Optional[RobotFileParser]) -> list:
+        """
+        Lista as URLs candidatas (sem a home), deduplicadas, permitidas
+        pelo robots.txt e ordenadas pela relevância.
+        """
+        if self.max_paginas <= 1:
+            return []
+
+        sitemaps = (robots.site_maps() if robots else None) or [f"{origem}/sitemap.xml"]
+        urls = await ler_sitemaps(sitemaps)
+        if not urls:
+            urls = [origem + caminho for caminho in CAMINHOS_PROVAVEIS]
+
+        host = _host_base(origem)
+        vistas = {home}
+        ranking = []
+        for url in urls:
+            url = normalizar_url(urljoin(origem, url))
+            if url in vistas or _host_base(url) != host:
+                continue
+            vistas.add(url)
+
+            if robots and not robots.can_fetch(CRAWLER_USER_AGENT, url):
+                continue
+
+            categoria, pontuacao = classificar_url(url)
+            if categoria:
+                ranking.append((pontuacao, url, categoria))
+
+        ranking.sort(key=lambda item: (-item[0], len(item[1])))
+        return [(url, categoria) for _, url, categoria in ranking[:self.max_paginas - 1]]
+
+    async def _visitar(self, candidatas: list, host: str, atraso: Optional[float], limite: float) -> list:
+        if not candidatas:
+            return []
+
+        # Crawl-delay no robots.txt: uma página por vez, espaçadas
+        concorrencia = 1 if atraso else self.concorrencia_por_host
+        concluidas: dict = {}
+
+        def visitar(url: str):
+            async def executar():
+                extract = await self.extrair(url)
+                if atraso:
+                    await asyncio.sleep(atraso)
+                return extract
+            return executar
+
+        def ao_concluir(indice, resultado):
+            concluidas[indice] = resultado
+
+        fanout = FanOut(limite_global=concorrencia, limite_por_chave=concorrencia)
+        tarefas = [Tarefa(chave=host, executar=visitar(url)) for url, _ in candidatas]
+
+        try:
+            await asyncio.wait_for(fanout.executar(tarefas, ao_concluir), max(0.0, limite - time.monotonic()))
+        except asyncio.TimeoutError:
+            pass
+
+        paginas = []
+        for indice, (url, categoria) in enumerate(candidatas):
+            resultado = concluidas.get(indice)
+            if resultado is None:
+                continue
+            paginas.append(PaginaRastreada(
+                url=url,
+                categoria=categoria,
+                extract=resultado.valor,
+                erro=str(resultado.erro) if resultado.erro is not None else None
+            ))
+        return paginas
+
+
+def classificar_url(url: str) -> tuple:
+    """
+    Classifica a URL pelo caminho. Retorna (categoria, pontuação) ou
+    (None, 0) para páginas irrelevantes; páginas mais rasas pontuam mais.
+
+    Ex: "https://x.com.br/solucoes/credito" -> ("servicos", 2.5)
+    """
+    caminho = urlsplit(url).path.lower()
+    if caminho.endswith(EXTENSOES_IGNORADAS):
+        return None, 0.0
+
+    segmentos = [s for s in caminho.split("/") if s]
+    if not segmentos:
+        return None, 0.0
+
+    termos = set()
+    for segmento in segmentos:
+        termos.update(re.split(r"[-_.]+", sem_acentos(segmento)))
+
+    if termos & IGNORAR:
+        return None, 0.0
+
+    for categoria, palavras in CATEGORIAS.items():
+        if termos & palavras:
+            return categoria, PESOS[categoria] - 0.5 * (len(segmentos) - 1)
+
+    return None, 0.0
+
+
+async def ler_robots(origem: str) -> Optional[RobotFileParser]:
+    """
+    Baixa e interpreta o robots.txt. Retorna None se não existir (tudo
+    permitido).
+    """
+    client = get_http("sites")
+    try:
+        response = await client.get(f"{origem}/robots.txt", timeout=DESCOBERTA_TIMEOUT, follow_redirects=True)
+    except Exception:
+        return None
+
+    if response.status_code != 200:
+        return None
+
+    robots = RobotFileParser()
+    robots.parse(response.text.splitlines())
+    return robots
+
+
+async def ler_sitemaps(sitemaps: list) -> list:
+    """
+    Lê os sitemaps (seguindo um nível de sitemap index) e retorna as URLs
+    de páginas encontradas.
+    """
+    urls: list = []
+    conteudos = await asyncio.gather(*(_baixar_sitemap(s) for s in sitemaps[:SITEMAP_MAX_ARQUIVOS]))
+
+    filhos = []
+    for conteudo in conteudos:
+        if conteudo is None:
+            continue
+        locs = [loc.decode("utf-8", "ignore") for loc in _RE_LOC.findall(conteudo)]
+        if b"<sitemapindex" in conteudo[:2048].lower():
+            filhos.extend(locs)
+        else:
+            urls.extend(locs)
+
+    if filhos:
+        # Sitemaps de páginas antes dos de posts, tags etc.
+        filhos.sort(key=lambda s: (not re.search(r"page|pagina", s, re.I), bool(re.search(r"post|blog|tag|categor", s, re.I))))
+        for conteudo in await asyncio.gather(*(_baixar_sitemap(s) for s in filhos[:SITEMAP_MAX_ARQUIVOS])):
+            if conteudo is not None:
+                urls.extend(loc.decode("utf-8", "ignore") for loc in _RE_LOC.findall(conteudo))
+
+    return urls
+
+
+async def _baixar_sitemap(url: str) -> Optional[bytes]:
+    client = get_http("sites")
+    try:
+        async with client.stream("GET", url, timeout=DESCOBERTA_TIMEOUT, follow_redirects=True) as response:
+            if response.status_code != 200:
+                return None
+            pedacos, lidos = [], 0
+            async for pedaco in response.aiter_bytes():
+                pedacos.append(pedaco)
+                lidos += len(pedaco)
+                if lidos >= SITEMAP_MAX_BYTES:
+                    break
+    except Exception:
+        return None
+
+    conteudo = b"".join(pedacos)
+
+    if url.endswith(".gz"):
+        try:
+            conteudo = gzip.decompress(conteudo)
+        except (OSError, EOFError):
+            return None
+
+    return conteudo[:SITEMAP_MAX_BYTES]
+
+
+def _host_base(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
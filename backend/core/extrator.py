@@ -0,0 +1,291 @@
+"""
+🧠 Extrator local: serviços, diferenciais e público a partir do HTML, sem API externa
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Optional
+
+from .html_head import DecodificadorHTML, extrair_jsonld
+from .texto import sem_acentos
+
+
+# Elementos que nunca são conteúdo
+TAGS_IGNORADAS = {"script", "style", "noscript", "svg", "template", "iframe", "canvas", "select"}
+# Boilerplate estrutural: menus, rodapés, formulários
+TAGS_BOILERPLATE = {"nav", "footer", "aside", "form", "dialog"}
+# Tokens de class/id/role (inteiros, não substrings: "has-sidebar" no
+# <body> não é barra lateral) que indicam boilerplate mesmo em <div>
+CLASSES_BOILERPLATE = {
+    "nav", "navbar", "navigation", "menu", "main-menu", "main-nav", "nav-menu", "menu-principal",
+    "footer", "site-footer", "rodape", "cookie", "cookies", "cookie-banner", "cookie-notice", "lgpd",
+    "breadcrumb", "breadcrumbs", "modal", "popup", "newsletter", "sidebar", "social", "social-links"
+}
+# Contêineres da página inteira: nunca descartados, seja qual for a classe
+TAGS_RAIZ = {"html", "body", "main"}
+TAGS_VAZIAS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+TAGS_TITULO = {"h1": 1, "h2": 2, "h3": 3, "h4": 4}
+TAGS_BLOCO = {"p", "li", "dd", "blockquote"}
+
+# Limites de memória do que é guardado por página
+MAX_SECOES = 200
+MAX_TEXTO = 500
+
+TIPOS_JSONLD = {"Organization", "Corporation", "LocalBusiness", "Product", "Service", "SoftwareApplication"}
+
+# Títulos de seção (sem acento, minúsculos) que indicam cada campo
+PALAVRAS_SERVICOS = (
+    "servico", "solucao", "solucoes", "produto", "o que fazemos", "o que oferecemos",
+    "plataforma", "funcionalidade", "recursos", "modulos",
+    "service", "solution", "product", "what we do", "features", "platform"
+)
+PALAVRAS_DIFERENCIAIS = (
+    "diferencia", "por que", "porque", "vantage", "beneficio",
+    "why", "benefit", "advantage"
+)
+PALAVRAS_PUBLICO = (
+    "para quem", "publico", "ideal para", "quem atendemos", "segmento", "setores", "mercados",
+    "who it's for", "who we serve", "industries"
+)
+_RE_PUBLICO = re.compile(
+    r"[^.!?]*\b(ideal para|feit[oa] para|pensad[oa] para|desenvolvid[oa] para|voltad[oa] para|"
+    r"para empresas|para (pequenas|médias|grandes)|para quem)\b[^.!?]*[.!?]?",
+    re.IGNORECASE
+)
+
+# Peso de cada campo na confiança da extração
+PESOS_CONFIANCA = {"description": 0.25, "services": 0.4, "differentials": 0.2, "target_audience": 0.15}
+
+
+class ParserConteudo(HTMLParser):
+    """
+    Segmenta o corpo da página por títulos (h1-h4): cada seção guarda
+    seu título, itens de lista e parágrafos. Scripts, menus, rodapés e
+    banners de cookie são descartados.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.secoes: list = [{"titulo": "", "nivel": 0, "itens": [], "paragrafos": []}]
+        self.schema: list = []
+        self._pulando: Optional[list] = None  # [tag, profundidade]
+        self._bloco: Optional[str] = None
+        self._texto: list = []
+        self._em_jsonld = False
+        self._jsonld: list = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in TAGS_VAZIAS:
+            return
+
+        if self._pulando is not None:
+            if tag == self._pulando[0]:
+                self._pulando[1] += 1
+            return
+
+        attrs = {k: (v or "") for k, v in attrs}
+
+        if tag == "script" and attrs.get("type", "").strip().lower() == "application/ld+json":
+            self._em_jsonld = True
+            self._jsonld = []
+            return
+
+        if tag in TAGS_IGNORADAS or tag in TAGS_BOILERPLATE or (tag not in TAGS_RAIZ and _boilerplate(attrs)):
+            self._fechar_bloco()
+            self._pulando = [tag, 1]
+            return
+
+        if tag in TAGS_TITULO or tag in TAGS_BLOCO:
+            self._fechar_bloco()
+            self._bloco = tag
+
+    def handle_endtag(self, tag):
+        if self._em_jsonld and tag == "script":
+            self._em_jsonld = False
+            self.schema.extend(extrair_jsonld("".join(self._jsonld), TIPOS_JSONLD))
+            return
+
+        if self._pulando is not None:
+            if tag == self._pulando[0]:
+                self._pulando[1] -= 1
+                if self._pulando[1] == 0:
+                    self._pulando = None
+            return
+
+        if tag == self._bloco:
+            self._fechar_bloco()
+
+    def handle_data(self, data):
+        if self._em_jsonld:
+            self._jsonld.append(data)
+        elif self._pulando is None and self._bloco is not None:
+            self._texto.append(data)
+
+    def close(self):
+        super().close()
+        self._fechar_bloco()
+
+    def _fechar_bloco(self):
+        tag, self._bloco = self._bloco, None
+        texto = " ".join("".join(self._texto).split())[:MAX_TEXTO]
+        self._texto = []
+        if not tag or not texto:
+            return
+
+        if tag in TAGS_TITULO:
+            if len(self.secoes) < MAX_SECOES:
+                self.secoes.append({"titulo": texto, "nivel": TAGS_TITULO[tag], "itens": [], "paragrafos": []})
+        elif tag == "p":
+            self.secoes[-1]["paragrafos"].append(texto)
+        else:
+            self.secoes[-1]["itens"].append(texto)
+
+
+class LeitorConteudo:
+    """
+    Alimentado com os mesmos pedaços de bytes do LeitorHead, até
+    `limite_bytes`; só as seções extraídas ficam em memória.
+    """
+
+    def __init__(self, content_type: Optional[str] = None, limite_bytes: int = 512 * 1024):
+        self.limite_bytes = limite_bytes
+        self.bytes_lidos = 0
+        self._parser = ParserConteudo()
+        self._decodificador = DecodificadorHTML(content_type)
+
+    def alimentar(self, pedaco: bytes) -> bool:
+        """
+        Processa um pedaço. Retorna True quando o limite foi atingido.
+        """
+        pedaco = pedaco[:self.limite_bytes - self.bytes_lidos]
+        self.bytes_lidos += len(pedaco)
+        if pedaco:
+            self._parser.feed(self._decodificador.decodificar(pedaco))
+        return self.bytes_lidos >= self.limite_bytes
+
+    def finalizar(self) -> dict:
+        self._parser.feed(self._decodificador.finalizar())
+        self._parser.close()
+        return {"secoes": self._parser.secoes, "schema": self._parser.schema}
+
+
+def extrair_local(head: dict, conteudo: Optional[dict] = None) -> dict:
+    """
+    Monta o extract no mesmo formato do Firecrawl (description, services,
+    differentials, target_audience) a partir do <head> e das seções do
+    corpo, com a confiança da extração (0 a 1) em `confianca`.
+
+    Fontes, em ordem de preferência:
+        description: meta/OpenGraph, JSON-LD, primeiro parágrafo substancial
+        services: JSON-LD (Product/Service/ofertas), seções de serviços
+        differentials: seções de diferenciais/benefícios
+        target_audience: seções "para quem", frases "ideal para ..."
+    """
+    conteudo = conteudo or {"secoes": [], "schema": []}
+    secoes = conteudo["secoes"]
+    # O corpo é lido desde o início: seu JSON-LD já inclui o do <head>
+    schema = conteudo["schema"] or head.get("schema", [])
+    og = head.get("opengraph", {})
+
+    description = (
+        head.get("description")
+        or og.get("description")
+        or next((s["description"] for s in schema if isinstance(s.get("description"), str)), "")
+        or next((p for s in secoes for p in s["paragrafos"] if len(p) >= 60), "")
+        or og.get("title")
+        or head.get("title", "")
+    )
+
+    services = _unicos(_servicos_jsonld(schema) + _itens_de(secoes, PALAVRAS_SERVICOS))
+    differentials = _unicos(_itens_de(secoes, PALAVRAS_DIFERENCIAIS))
+
+    publico = _itens_de(secoes, PALAVRAS_PUBLICO)
+    if publico:
+        target_audience = ", ".join(publico[:6])
+    else:
+        target_audience = next((
+            m.group(0).strip()
+            for s in secoes for p in s["paragrafos"]
+            for m in [_RE_PUBLICO.search(p)] if m
+        ), "")
+
+    extract = {
+        "title": head.get("title", ""),
+        "description": description,
+        "services": services[:12],
+        "differentials": differentials[:8],
+        "target_audience": target_audience
+    }
+    extract["confianca"] = confianca(extract)
+    return extract
+
+
+def confianca(extract: dict) -> float:
+    """
+    Quão completo está o extract: cada campo preenchido soma seu peso
+    (serviços contam metade com um item só).
+    """
+    total = 0.0
+    for campo, peso in PESOS_CONFIANCA.items():
+        valor = extract.get(campo)
+        if campo == "services" and isinstance(valor, list) and len(valor) == 1:
+            total += peso / 2
+        elif valor:
+            total += peso
+    return round(total, 2)
+
+
+def _boilerplate(attrs: dict) -> bool:
+    marcadores = f"{attrs.get('class', '')} {attrs.get('id', '')} {attrs.get('role', '')}".lower().split()
+    return any(m in CLASSES_BOILERPLATE for m in marcadores)
+
+
+def _servicos_jsonld(schema: list) -> list:
+    nomes = []
+    for item in schema:
+        tipos = item.get("@type")
+        tipos = tipos if isinstance(tipos, list) else [tipos]
+        if any(t in ("Product", "Service", "SoftwareApplication") for t in tipos):
+            nomes.append(item.get("name"))
+
+        # Organization.makesOffer / hasOfferCatalog.itemListElement
+        ofertas = item.get("makesOffer") or (item.get("hasOfferCatalog") or {}).get("itemListElement") or []
+        for oferta in ofertas if isinstance(ofertas, list) else [ofertas]:
+            if isinstance(oferta, dict):
+                ofertado = oferta.get("itemOffered") if isinstance(oferta.get("itemOffered"), dict) else oferta
+                nomes.append(ofertado.get("name"))
+
+    return [n for n in nomes if isinstance(n, str)]
+
+
+def _itens_de(secoes: list, palavras: tuple) -> list:
+    """
+    Itens das seções cujo título casa com `palavras`: itens de lista
+    curtos e, no lugar deles, os subtítulos logo abaixo da seção.
+    """
+    itens = []
+    for i, secao in enumerate(secoes):
+        if not secao["titulo"] or not any(p in sem_acentos(secao["titulo"]) for p in palavras):
+            continue
+
+        itens.extend(item for item in secao["itens"] if len(item) <= 120)
+
+        for sub in secoes[i + 1:]:
+            if sub["nivel"] <= secao["nivel"]:
+                break
+            if len(sub["titulo"]) <= 80:
+                itens.append(sub["titulo"])
+            itens.extend(item for item in sub["itens"] if len(item) <= 120)
+
+    return itens
+
+
+def _unicos(itens: list) -> list:
+    vistos = set()
+    saida = []
+    for item in itens:
+        chave = item.strip().lower()
+        if chave and chave not in vistos:
+            vistos.add(chave)
+            saida.append(item.strip())
+    return saida
@@ -0,0 +1,93 @@
+"""
+⚡ Fan-out concorrente de chamadas (ex: prompt × LLM)
+"""
+
+import asyncio
+from dataclasses import dataclass
+import inspect
+from typing import Any, Awaitable, Callable, Optional
+
+
+@dataclass
+class Tarefa:
+    """
+    Uma unidade de trabalho do fan-out.
+
+    `chave` identifica o provedor (ex: "chatgpt") e define qual limite
+    por provedor se aplica. `executar` é uma fábrica de corrotina, chamada
+    só quando há vaga nos semáforos.
+    """
+    chave: str
+    executar: Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class ResultadoTarefa:
+    """Resultado de uma tarefa: valor ou exceção, nunca os dois."""
+    chave: str
+    valor: Any = None
+    erro: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.erro is None
+
+
+class FanOut:
+    """
+    Executa tarefas concorrentemente com limite global e limite por chave.
+
+    Os resultados voltam na mesma ordem das tarefas de entrada, e a falha
+    de uma tarefa não derruba as demais.
+    """
+
+    def __init__(
+        self,
+        limite_global: int = 16,
+        limite_por_chave: int = 4,
+        limites: Optional[dict] = None
+    ):
+        self.limite_global = max(1, limite_global)
+        self.limite_por_chave = max(1, limite_por_chave)
+        self.limites = limites or {}
+
+    async def executar(
+        self,
+        tarefas: list,
+        ao_concluir: Optional[Callable[[int, ResultadoTarefa], Any]] = None
+    ) -> list:
+        """
+        Roda todas as tarefas e retorna uma lista de `ResultadoTarefa`
+        alinhada com `tarefas`.
+
+        `ao_concluir(indice, resultado)` é chamado (e aguardado, se for
+        corrotina) à medida que cada tarefa termina, em ordem de chegada.
+        """
+        sem_global = asyncio.Semaphore(self.limite_global)
+        sem_chaves: dict = {}
+
+        def semaforo(chave: str) -> asyncio.Semaphore:
+            if chave not in sem_chaves:
+                limite = self.limites.get(chave, self.limite_por_chave)
+                sem_chaves[chave] = asyncio.Semaphore(max(1, limite))
+            return sem_chaves[chave]
+
+        async def rodar(indice: int, tarefa: Tarefa) -> ResultadoTarefa:
+            # Pega primeiro o semáforo do provedor para não ocupar vaga
+            # global enquanto espera um provedor saturado.
+            async with semaforo(tarefa.chave):
+                async with sem_global:
+                    try:
+                        valor = await tarefa.executar()
+                        resultado = ResultadoTarefa(chave=tarefa.chave, valor=valor)
+                    except Exception as e:
+                        resultado = ResultadoTarefa(chave=tarefa.chave, erro=e)
+
+            if ao_concluir is not None:
+                retorno = ao_concluir(indice, resultado)
+                if inspect.isawaitable(retorno):
+                    await retorno
+
+            return resultado
+
+        return await asyncio.gather(*(rodar(i, t) for i, t in enumerate(tarefas)))
@@ -0,0 +1,115 @@
+"""
+♊ Cliente assíncrono do Google Gemini (API REST via httpx)
+"""
+
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+
+class GeminiClient:
+    """
+    Chama o Gemini pela API REST usando um httpx.AsyncClient compartilhado.
+
+    Não usa threads: cada chamada é uma corrotina, então centenas de prompts
+    em paralelo custam só conexões do pool. O semáforo limita quantas
+    chamadas ficam em voo ao mesmo tempo, e cancelar a task cancela a
+    requisição HTTP.
+    """
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        api_key: str,
+        concorrencia: int = 32,
+        timeout: float = 60.0
+    ):
+        self.http_client = http_client
+        self.api_key = api_key
+        self.timeout = timeout
+        self._semaforo = asyncio.Semaphore(max(1, concorrencia))
+
+    async def gerar(
+        self,
+        prompt: str,
+        modelo: str = "gemini-pro",
+        timeout: Optional[float] = None,
+        config: Optional[dict] = None
+    ) -> str:
+        """
+        Gera uma resposta para o prompt e retorna o texto.
+        """
+        payload = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if config:
+            payload["generationConfig"] = config
+
+        async with self._semaforo:
+            response = await self.http_client.post(
+                f"{GEMINI_API_URL}/models/{modelo}:generateContent",
+                headers={"x-goog-api-key": self.api_key},
+                json=payload,
+                timeout=timeout or self.timeout
+            )
+
+        response.raise_for_status()
+        return extrair_texto(response.json())
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        prompt: str,
+        modelo: str = "gemini-pro",
+        timeout: Optional[float] = None,
+        config: Optional[dict] = None
+    ):
+        """
+        Abre um streaming (SSE) e entrega um iterador de eventos JSON.
+
+        Sair do bloco `async with` fecha a conexão, o que interrompe a
+        geração no meio quando o resultado já basta.
+        """
+        payload = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if config:
+            payload["generationConfig"] = config
+
+        async with self._semaforo:
+            request = self.http_client.build_request(
+                "POST",
+                f"{GEMINI_API_URL}/models/{modelo}:streamGenerateContent",
+                params={"alt": "sse"},
+                headers={"x-goog-api-key": self.api_key},
+                json=payload,
+                timeout=timeout or self.timeout
+            )
+            response = await self.http_client.send(request, stream=True)
+
+            try:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                yield _eventos_sse(response)
+            finally:
+                await response.aclose()
+
+
+async def _eventos_sse(response: httpx.Response) -> AsyncIterator[dict]:
+    async for linha in response.aiter_lines():
+        if linha.startswith("data:"):
+            yield json.loads(linha[5:].strip())
+
+
+def extrair_texto(data: dict) -> str:
+    """Junta as partes de texto do primeiro candidato."""
+    candidatos = data.get("candidates") or []
+    if not candidatos:
+        motivo = data.get("promptFeedback", {}).get("blockReason", "sem candidatos")
+        raise ValueError(f"Gemini não retornou texto ({motivo})")
+
+    partes = candidatos[0].get("content", {}).get("parts", [])
+    return "".join(p.get("text", "") for p in partes)
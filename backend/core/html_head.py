@@ -0,0 +1,236 @@
+"""
+🧾 Leitura incremental do <head> HTML (título, description, OpenGraph, JSON-LD)
+"""
+
+import re
+import json
+import codecs
+from html.parser import HTMLParser
+from typing import Optional
+
+
+# Tipos JSON-LD aproveitados no diagnóstico
+TIPOS_SCHEMA = {"Organization", "Corporation", "LocalBusiness", "Product"}
+
+# Tags que só aparecem no corpo: se surgirem, o <head> acabou mesmo sem </head>
+TAGS_CORPO = {"body", "main", "header", "nav", "section", "article", "div", "h1", "p"}
+
+# Bytes examinados para achar o charset declarado no próprio HTML
+BYTES_SNIFF = 1024
+
+_RE_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_\-:.]+)', re.IGNORECASE)
+
+
+class ParserHead(HTMLParser):
+    """
+    Parser que coleta os metadados do <head> e marca `concluido` ao
+    encontrar </head> (ou o início do corpo).
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.titulo = ""
+        self.description = ""
+        self.opengraph: dict = {}
+        self.schema: list = []
+        self.concluido = False
+        self._em_titulo = False
+        self._em_jsonld = False
+        self._jsonld: list = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.concluido:
+            return
+
+        if tag in TAGS_CORPO:
+            self.concluido = True
+            return
+
+        attrs = {k: (v or "") for k, v in attrs}
+
+        if tag == "title":
+            self._em_titulo = True
+        elif tag == "meta":
+            self._meta(attrs)
+        elif tag == "script" and attrs.get("type", "").strip().lower() == "application/ld+json":
+            self._em_jsonld = True
+            self._jsonld = []
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.concluido = True
+        elif tag == "title":
+            self._em_titulo = False
+        elif tag == "script" and self._em_jsonld:
+            self._em_jsonld = False
+            self._ler_jsonld("".join(self._jsonld))
+
+    def handle_data(self, data):
+        if self._em_titulo:
+            self.titulo += data
+        elif self._em_jsonld:
+            self._jsonld.append(data)
+
+    def _meta(self, attrs: dict):
+        # Atributos podem vir em qualquer ordem; og:* usa `property`,
+        # mas muitos sites usam `name`
+        chave = (attrs.get("property") or attrs.get("name") or "").strip().lower()
+        conteudo = attrs.get("content", "").strip()
+        if not chave or not conteudo:
+            return
+
+        if chave == "description" and not self.description:
+            self.description = conteudo
+        elif chave.startswith("og:"):
+            self.opengraph.setdefault(chave[3:], conteudo)
+
+    def _ler_jsonld(self, texto: str):
+        self.schema.extend(extrair_jsonld(texto))
+
+    def resultado(self) -> dict:
+        return {
+            "title": " ".join(self.titulo.split()),
+            "description": self.description,
+            "opengraph": self.opengraph,
+            "schema": self.schema
+        }
+
+
+class DecodificadorHTML:
+    """
+    Decodifica bytes de HTML em pedaços. O charset vem do Content-Type
+    ou, se ausente, do BOM / <meta charset> nos primeiros bytes; até
+    descobri-lo, o começo fica acumulado.
+    """
+
+    def __init__(self, content_type: Optional[str] = None):
+        self.charset = charset_do_header(content_type)
+        self._decoder = None
+        self._inicio = b""
+
+    def decodificar(self, pedaco: bytes) -> str:
+        if self._decoder is None:
+            self._inicio += pedaco
+            if len(self._inicio) < BYTES_SNIFF:
+                return ""
+            pedaco, self._inicio = self._inicio, b""
+            self._criar_decoder(pedaco)
+        return self._decoder.decode(pedaco)
+
+    def finalizar(self) -> str:
+        texto = ""
+        if self._decoder is None:
+            pedaco, self._inicio = self._inicio, b""
+            self._criar_decoder(pedaco)
+            texto = self._decoder.decode(pedaco)
+        return texto + self._decoder.decode(b"", final=True)
+
+    def _criar_decoder(self, inicio: bytes):
+        if not self.charset:
+            self.charset = charset_do_conteudo(inicio) or "utf-8"
+        self._decoder = codecs.getincrementaldecoder(self.charset)(errors="replace")
+
+
+class LeitorHead:
+    """
+    Alimentado com pedaços de bytes da resposta; decodifica de forma
+    incremental e para de consumir quando o <head> termina.
+
+    Uso:
+        leitor = LeitorHead(response.headers.get("content-type"))
+        async for pedaco in response.aiter_bytes():
+            if leitor.alimentar(pedaco):
+                break
+        dados = leitor.finalizar()
+    """
+
+    def __init__(self, content_type: Optional[str] = None, limite_bytes: int = 256 * 1024):
+        self.limite_bytes = limite_bytes
+        self.bytes_lidos = 0
+        self._parser = ParserHead()
+        self._decodificador = DecodificadorHTML(content_type)
+
+    @property
+    def concluido(self) -> bool:
+        return self._parser.concluido or self.bytes_lidos >= self.limite_bytes
+
+    def alimentar(self, pedaco: bytes) -> bool:
+        """
+        Processa um pedaço. Retorna True quando não é preciso ler mais.
+        """
+        if self.concluido:
+            return True
+
+        pedaco = pedaco[:self.limite_bytes - self.bytes_lidos]
+        self.bytes_lidos += len(pedaco)
+
+        self._parser.feed(self._decodificador.decodificar(pedaco))
+        return self.concluido
+
+    def finalizar(self) -> dict:
+        self._parser.feed(self._decodificador.finalizar())
+        self._parser.close()
+
+        dados = self._parser.resultado()
+        dados["charset"] = self._decodificador.charset
+        dados["bytes_lidos"] = self.bytes_lidos
+        return dados
+
+
+def extrair_jsonld(texto: str, tipos: set = TIPOS_SCHEMA) -> list:
+    """
+    Lê um bloco JSON-LD e retorna os itens (inclusive dentro de @graph)
+    cujo @type está em `tipos`.
+    """
+    try:
+        dados = json.loads(texto)
+    except ValueError:
+        return []
+
+    itens = []
+    pendentes = [dados]
+    while pendentes:
+        item = pendentes.pop()
+        if isinstance(item, list):
+            pendentes.extend(item)
+        elif isinstance(item, dict):
+            if "@graph" in item:
+                pendentes.append(item["@graph"])
+            tipos_item = item.get("@type")
+            tipos_item = tipos_item if isinstance(tipos_item, list) else [tipos_item]
+            if any(t in tipos for t in tipos_item):
+                itens.append(item)
+    return itens
+
+
+def charset_do_header(content_type: Optional[str]) -> Optional[str]:
+    """
+    Extrai o charset do header Content-Type, se válido.
+    """
+    if not content_type:
+        return None
+    match = re.search(r'charset\s*=\s*["\']?([\w\-:.]+)', content_type, re.IGNORECASE)
+    return _charset_valido(match.group(1)) if match else None
+
+
+def charset_do_conteudo(inicio: bytes) -> Optional[str]:
+    """
+    Detecta o charset por BOM ou <meta charset> / http-equiv nos
+    primeiros bytes do documento.
+    """
+    for bom, nome in ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16")):
+        if inicio.startswith(bom):
+            return nome
+
+    match = _RE_CHARSET.search(inicio[:BYTES_SNIFF])
+    return _charset_valido(match.group(1).decode("ascii", "ignore")) if match else None
+
+
+def _charset_valido(nome: str) -> Optional[str]:
+    try:
+        return codecs.lookup(nome).name
+    except LookupError:
+        return None
@@ -0,0 +1,235 @@
+"""
+🌐 Pools HTTP compartilhados: keep-alive, HTTP/2, limite por host e cache de DNS
+"""
+
+import time
+import socket
+import asyncio
+import ipaddress
+import importlib.util
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import httpx
+import httpcore
+
+
+# HTTP/2 só quando o pacote `h2` está instalado (httpx[http2])
+HTTP2_DISPONIVEL = importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class MetricasPool:
+    requisicoes: int = 0
+    conexoes_novas: int = 0
+    resolucoes_dns: int = 0
+    hits_dns: int = 0
+    em_voo: int = 0
+    aguardando_host: int = 0
+
+    @property
+    def conexoes_reaproveitadas(self) -> int:
+        return max(0, self.requisicoes - self.conexoes_novas)
+
+    def to_dict(self) -> dict:
+        dados = asdict(self)
+        dados["conexoes_reaproveitadas"] = self.conexoes_reaproveitadas
+        return dados
+
+
+class DNSCacheBackend(httpcore.AsyncNetworkBackend):
+    """
+    Backend de rede do httpcore que guarda a resolução DNS por `ttl` segundos.
+
+    O SNI/verificação TLS continua usando o hostname original (o httpcore
+    passa o host da origem para o start_tls), só o connect usa o IP.
+    """
+
+    def __init__(self, metricas: MetricasPool, ttl: float = 300.0):
+        self._backend = httpcore.AnyIOBackend()
+        self._cache: dict = {}
+        self.metricas = metricas
+        self.ttl = ttl
+
+    async def _resolver(self, host: str, port: int) -> str:
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+
+        item = self._cache.get((host, port))
+        if item and item[0] > time.monotonic():
+            self.metricas.hits_dns += 1
+            return item[1]
+
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        ip = infos[0][4][0]
+        self._cache[(host, port)] = (time.monotonic() + self.ttl, ip)
+        self.metricas.resolucoes_dns += 1
+        return ip
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        ip = await self._resolver(host, port)
+        self.metricas.conexoes_novas += 1
+
+        try:
+            return await self._backend.connect_tcp(
+                ip, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+            )
+        except (httpcore.ConnectError, httpcore.ConnectTimeout, OSError):
+            # IP possivelmente velho: a próxima tentativa resolve de novo
+            self._cache.pop((host, port), None)
+            raise
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class _StreamComLiberacao(httpx.AsyncByteStream):
+    """Corpo de resposta que libera a vaga do host quando é fechado."""
+
+    def __init__(self, stream, liberar):
+        self._stream = stream
+        self._liberar = liberar
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._liberar()
+
+
+class TransporteLimitado(httpx.AsyncBaseTransport):
+    """
+    Limita quantas requisições ficam abertas por host ao mesmo tempo.
+
+    A vaga só é liberada quando o corpo da resposta é fechado, então
+    downloads em streaming também contam.
+    """
+
+    def __init__(self, transporte: httpx.AsyncBaseTransport, limite_por_host: int, metricas: MetricasPool):
+        self._transporte = transporte
+        self.limite_por_host = max(1, limite_por_host)
+        self.metricas = metricas
+        self._semaforos: dict = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        semaforo = self._semaforos.setdefault(host, asyncio.Semaphore(self.limite_por_host))
+
+        self.metricas.aguardando_host += 1
+        try:
+            await semaforo.acquire()
+        finally:
+            self.metricas.aguardando_host -= 1
+
+        self.metricas.requisicoes += 1
+        self.metricas.em_voo += 1
+        liberado = False
+
+        def liberar() -> None:
+            nonlocal liberado
+            if not liberado:
+                liberado = True
+                self.metricas.em_voo -= 1
+                semaforo.release()
+
+        try:
+            response = await self._transporte.handle_async_request(request)
+        except BaseException:
+            liberar()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_StreamComLiberacao(response.stream, liberar),
+            extensions=response.extensions
+        )
+
+    async def aclose(self) -> None:
+        await self._transporte.aclose()
+
+
+class PoolHTTP:
+    """
+    Um httpx.AsyncClient de longa duração com métricas do pool.
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        timeout: float,
+        max_conexoes: int,
+        max_keepalive: int,
+        keepalive_expiry: float,
+        limite_por_host: int,
+        dns_ttl: float = 300.0
+    ):
+        self.nome = nome
+        self.metricas = MetricasPool()
+        limits = httpx.Limits(
+            max_connections=max_conexoes,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+
+        transporte = httpx.AsyncHTTPTransport(http2=HTTP2_DISPONIVEL, limits=limits)
+        self._pool = _trocar_pool(
+            transporte,
+            max_connections=max_conexoes,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+            http1=True,
+            http2=HTTP2_DISPONIVEL,
+            network_backend=DNSCacheBackend(self.metricas, ttl=dns_ttl)
+        )
+
+        self.client = httpx.AsyncClient(
+            transport=TransporteLimitado(transporte, limite_por_host, self.metricas),
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 10.0))
+        )
+
+    def estatisticas(self) -> dict:
+        dados = self.metricas.to_dict()
+        conexoes = getattr(self._pool, "connections", None)
+        if conexoes is not None:
+            dados["conexoes_abertas"] = len(conexoes)
+            dados["conexoes_ociosas"] = sum(1 for c in conexoes if getattr(c, "is_idle", lambda: False)())
+        return dados
+
+    async def fechar(self) -> None:
+        await self.client.aclose()
+
+
+def _trocar_pool(transporte: httpx.AsyncHTTPTransport, **opcoes) -> Optional[httpcore.AsyncConnectionPool]:
+    """
+    Troca o pool interno do transporte por um igual, só que com as opções
+    dadas (o httpx não expõe o network_backend do httpcore).
+
+    Depende de detalhes internos do httpx (`_pool`, `_ssl_context`): se
+    eles mudarem numa atualização, o transporte fica com o pool padrão
+    (sem cache de DNS nem contagem de conexões) em vez de quebrar.
+    """
+    pool_original = getattr(transporte, "_pool", None)
+    if not isinstance(pool_original, httpcore.AsyncConnectionPool):
+        print("⚠️ Pool interno do httpx não encontrado, cache de DNS desativado")
+        return None
+
+    ssl_context = getattr(pool_original, "_ssl_context", None) or httpx.create_ssl_context()
+    try:
+        pool = httpcore.AsyncConnectionPool(ssl_context=ssl_context, **opcoes)
+    except TypeError as e:
+        print(f"⚠️ Não foi possível recriar o pool do httpx, cache de DNS desativado: {e}")
+        return None
+
+    transporte._pool = pool
+    return pool
@@ -0,0 +1,274 @@
+"""
+🔎 Detecção de menções de marca (aliases e concorrentes) em uma passada
+"""
+
+import json
+import hashlib
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+# Separadores "fracos" somem na normalização: "Data Risk", "Data-Risk"
+# e "Datarisk" viram a mesma sequência. Qualquer outra pontuação vira um
+# separador "forte", que só casa com pontuação no próprio termo.
+SEPARADORES_FRACOS = frozenset("-_‐‑")
+SEPARADOR_FORTE = "\x00"
+
+
+_FRACO = object()
+_FORTE = object()
+_DOBRADOS: dict = {}
+
+
+def _dobrar(ch: str) -> str:
+    """Remove acentos e caixa de um caractere alfanumérico."""
+    decomposto = unicodedata.normalize("NFKD", ch)
+    sem_acento = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return "".join(c for c in sem_acento.casefold() if c.isalnum())
+
+
+def _classificar(ch: str):
+    """
+    Classifica um caractere: texto normalizado, separador fraco, separador
+    forte ou "" (acento solto, ignorado). O resultado fica memorizado.
+    """
+    if ch.isalnum():
+        classe = _dobrar(ch)
+    elif unicodedata.combining(ch):
+        classe = ""
+    elif ch.isspace() or ch in SEPARADORES_FRACOS:
+        classe = _FRACO
+    else:
+        classe = _FORTE
+
+    if len(_DOBRADOS) < 65536:
+        _DOBRADOS[ch] = classe
+    return classe
+
+
+def normalizar(texto: str) -> str:
+    """
+    Normaliza um termo do mesmo jeito que o texto é varrido.
+    """
+    saida = []
+    for ch in texto:
+        classe = _classificar(ch)
+        if classe is _FRACO:
+            continue
+        elif classe is _FORTE:
+            if saida and saida[-1] != SEPARADOR_FORTE:
+                saida.append(SEPARADOR_FORTE)
+        else:
+            saida.append(classe)
+    return "".join(saida).strip(SEPARADOR_FORTE)
+
+
+@dataclass(frozen=True)
+class Ocorrencia:
+    entidade: str
+    termo: str
+    inicio: int
+    fim: int
+
+
+class MentionMatcher:
+    """
+    Autômato Aho-Corasick sobre texto normalizado (sem acento, sem caixa).
+
+    Cada entidade (marca, concorrente) tem um ou mais termos. Uma ocorrência
+    só conta se começa e termina em fronteira de palavra, e as posições
+    retornadas se referem ao texto original.
+
+    `assinatura` identifica o conjunto de entidades e termos (normalizados):
+    resultados de matchers com a mesma assinatura são comparáveis.
+    """
+
+    def __init__(self, entidades: dict):
+        self.entidades = list(entidades)
+        self.assinatura = hashlib.sha256(json.dumps(
+            {entidade: sorted({normalizar(termo) for termo in termos}) for entidade, termos in entidades.items()},
+            sort_keys=True, ensure_ascii=False
+        ).encode("utf-8")).hexdigest()[:16]
+        self._goto: list = [{}]
+        self._falha: list = [0]
+        self._saidas: list = [[]]
+        self.max_len = 1
+
+        for entidade, termos in entidades.items():
+            for termo in termos:
+                normalizado = normalizar(termo)
+                if normalizado:
+                    self._adicionar(normalizado, entidade, termo)
+                    self.max_len = max(self.max_len, len(normalizado))
+
+        self._construir_falhas()
+
+    def _adicionar(self, normalizado: str, entidade: str, termo: str) -> None:
+        estado = 0
+        for ch in normalizado:
+            proximo = self._goto[estado].get(ch)
+            if proximo is None:
+                proximo = len(self._goto)
+                self._goto[estado][ch] = proximo
+                self._goto.append({})
+                self._falha.append(0)
+                self._saidas.append([])
+            estado = proximo
+        self._saidas[estado].append((len(normalizado), entidade, termo))
+
+    def _construir_falhas(self) -> None:
+        fila = deque(self._goto[0].values())
+        while fila:
+            estado = fila.popleft()
+            for ch, proximo in self._goto[estado].items():
+                fila.append(proximo)
+                falha = self._falha[estado]
+                while falha and ch not in self._goto[falha]:
+                    falha = self._falha[falha]
+                destino = self._goto[falha].get(ch, 0)
+                self._falha[proximo] = destino if destino != proximo else 0
+                self._saidas[proximo] = self._saidas[proximo] + self._saidas[self._falha[proximo]]
+
+    def varredura(self) -> "Varredura":
+        """Cria uma varredura incremental (para texto que chega em partes)."""
+        return Varredura(self)
+
+    def buscar(self, texto: str) -> dict:
+        """
+        Retorna {entidade: [(inicio, fim), ...]} para todas as entidades.
+        """
+        varredura = self.varredura()
+        varredura.alimentar(texto)
+        varredura.finalizar()
+        return varredura.posicoes()
+
+    def contar(self, texto: str) -> dict:
+        return {entidade: len(posicoes) for entidade, posicoes in self.buscar(texto).items()}
+
+
+class Varredura:
+    """
+    Estado de uma varredura do MentionMatcher.
+
+    O texto pode ser alimentado em pedaços; as ocorrências são as mesmas
+    de uma varredura única. Uma ocorrência só é confirmada quando o próximo
+    caractere mostra que a palavra terminou (ou em `finalizar`).
+    """
+
+    def __init__(self, matcher: MentionMatcher):
+        self.matcher = matcher
+        self.ocorrencias: list = []
+        self._estado = 0
+        self._offset = 0
+        self._anterior_alnum = False
+        self._ultimo_forte = True
+        # (posição original, início de palavra) dos últimos caracteres normalizados
+        self._janela: deque = deque(maxlen=matcher.max_len)
+        self._pendentes: list = []
+
+    def alimentar(self, texto: str) -> list:
+        """Processa mais texto e retorna as ocorrências novas confirmadas."""
+        antes = len(self.ocorrencias)
+
+        # Laço quente: estado em variáveis locais
+        goto = self.matcher._goto
+        falha = self.matcher._falha
+        saidas = self.matcher._saidas
+        classes = _DOBRADOS.get
+        janela = self._janela
+        pendentes = self._pendentes
+        ocorrencias = self.ocorrencias
+        estado = self._estado
+        anterior_alnum = self._anterior_alnum
+        ultimo_forte = self._ultimo_forte
+
+        for i, ch in enumerate(texto, start=self._offset):
+            classe = classes(ch)
+            if classe is None:
+                classe = _classificar(ch)
+
+            if classe is _FRACO:
+                anterior_alnum = False
+                continue
+            if classe is _FORTE:
+                anterior_alnum = False
+                if ultimo_forte:
+                    continue
+                ultimo_forte = True
+                classe = SEPARADOR_FORTE
+                inicio_palavra = True
+            elif not classe:
+                continue
+            else:
+                inicio_palavra = not anterior_alnum
+                anterior_alnum = True
+                ultimo_forte = False
+
+            for c in classe:
+                # Fim de palavra confirma as ocorrências pendentes; meio de
+                # palavra as descarta ("Nu" não casa com "Nubank").
+                if pendentes:
+                    if inicio_palavra:
+                        ocorrencias.extend(pendentes)
+                    pendentes.clear()
+
+                janela.append((i, inicio_palavra))
+                inicio_palavra = False
+
+                while estado and c not in goto[estado]:
+                    estado = falha[estado]
+                estado = goto[estado].get(c, 0)
+
+                if estado:
+                    for tamanho, entidade, termo in saidas[estado]:
+                        inicio, comeca_palavra = janela[-tamanho]
+                        if comeca_palavra:
+                            pendentes.append(Ocorrencia(entidade, termo, inicio, i + 1))
+
+        self._estado = estado
+        self._anterior_alnum = anterior_alnum
+        self._ultimo_forte = ultimo_forte
+        self._offset += len(texto)
+        return ocorrencias[antes:]
+
+    def finalizar(self) -> list:
+        """Confirma ocorrências que terminam no fim do texto."""
+        antes = len(self.ocorrencias)
+        self.ocorrencias.extend(self._pendentes)
+        self._pendentes.clear()
+        return self.ocorrencias[antes:]
+
+    def posicoes(self) -> dict:
+        """
+        {entidade: [(inicio, fim), ...]}, sem ocorrências contidas em
+        outra da mesma entidade (ex: alias curto dentro de um longo).
+        """
+        por_entidade: dict = {entidade: [] for entidade in self.matcher.entidades}
+
+        for oc in sorted(self.ocorrencias, key=lambda o: (o.inicio, -o.fim)):
+            spans = por_entidade[oc.entidade]
+            if spans and spans[-1][0] <= oc.inicio and oc.fim <= spans[-1][1]:
+                continue
+            spans.append((oc.inicio, oc.fim))
+
+        return por_entidade
+
+    def encontrou(self, entidade: str) -> bool:
+        return any(oc.entidade == entidade for oc in self.ocorrencias)
+
+
+def criar_matcher(
+    empresa: str,
+    aliases: Optional[list] = None,
+    concorrentes: Optional[list] = None
+) -> MentionMatcher:
+    """
+    Monta o matcher da marca (nome + aliases) e de cada concorrente.
+    """
+    entidades = {empresa: [empresa] + list(aliases or [])}
+    for concorrente in concorrentes or []:
+        if concorrente and concorrente not in entidades:
+            entidades[concorrente] = [concorrente]
+    return MentionMatcher(entidades)
@@ -0,0 +1,204 @@
+"""
+🚦 Limitador de taxa adaptativo por provedor/modelo com retry e backoff
+"""
+
+import os
+import time
+import random
+import asyncio
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+
+import httpx
+import openai
+
+
+# Taxa inicial (requisições/s) por provedor; o limitador aprende a partir daí
+TAXAS_INICIAIS = {
+    "chatgpt": float(os.getenv("RATE_LIMIT_CHATGPT_RPS", "8")),
+    "gemini": float(os.getenv("RATE_LIMIT_GEMINI_RPS", "2")),
+}
+TAXA_PADRAO = float(os.getenv("RATE_LIMIT_PADRAO_RPS", "2"))
+RETRY_TENTATIVAS = int(os.getenv("RETRY_TENTATIVAS", "4"))
+RETRY_BASE = float(os.getenv("RETRY_BASE", "0.5"))
+RETRY_TETO = float(os.getenv("RETRY_TETO", "30"))
+
+STATUS_TRANSITORIOS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LimitadorAdaptativo:
+    """
+    Token bucket com ajuste AIMD da taxa.
+
+    Cada sucesso aumenta a taxa um pouco (até `taxa_max`); cada 429 corta a
+    taxa pela metade (até `taxa_min`) e, se houver Retry-After, pausa todas
+    as chamadas até lá.
+    """
+
+    def __init__(
+        self,
+        taxa: float,
+        taxa_min: Optional[float] = None,
+        taxa_max: Optional[float] = None,
+        capacidade: Optional[float] = None
+    ):
+        self.taxa = taxa
+        self.taxa_min = taxa_min or max(taxa / 16, 0.05)
+        self.taxa_max = taxa_max or taxa * 4
+        self.capacidade = capacidade or max(1.0, taxa)
+        self.aumento = self.taxa_max * 0.02
+
+        self._tokens = self.capacidade
+        self._atualizado_em = time.monotonic()
+        self._pausado_ate = 0.0
+        self._lock = asyncio.Lock()
+
+        self.limites_recebidos = 0
+
+    def _reabastecer(self, agora: float) -> None:
+        decorrido = agora - self._atualizado_em
+        self._tokens = min(self.capacidade, self._tokens + decorrido * self.taxa)
+        self._atualizado_em = agora
+
+    async def adquirir(self) -> None:
+        """Espera até haver um token disponível."""
+        async with self._lock:
+            while True:
+                agora = time.monotonic()
+                if self._pausado_ate > agora:
+                    await asyncio.sleep(self._pausado_ate - agora)
+                    continue
+
+                self._reabastecer(agora)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.taxa)
+
+    def registrar_sucesso(self) -> None:
+        self.taxa = min(self.taxa_max, self.taxa + self.aumento)
+
+    def registrar_limite(self, retry_after: Optional[float] = None) -> None:
+        self.limites_recebidos += 1
+        self.taxa = max(self.taxa_min, self.taxa / 2)
+        self._tokens = 0
+
+        if retry_after:
+            self._pausado_ate = max(self._pausado_ate, time.monotonic() + retry_after)
+
+    def estado(self) -> dict:
+        return {
+            "taxa": round(self.taxa, 3),
+            "limites_recebidos": self.limites_recebidos
+        }
+
+
+_limitadores: dict = {}
+
+
+def get_limitador(provedor: str, modelo: str) -> LimitadorAdaptativo:
+    """Limitador compartilhado por (provedor, modelo)."""
+    chave = (provedor, modelo)
+    if chave not in _limitadores:
+        _limitadores[chave] = LimitadorAdaptativo(TAXAS_INICIAIS.get(provedor, TAXA_PADRAO))
+    return _limitadores[chave]
+
+
+def estado_limitadores() -> dict:
+    return {f"{p}/{m}": limitador.estado() for (p, m), limitador in _limitadores.items()}
+
+
+def _status(erro: BaseException) -> Optional[int]:
+    status = getattr(erro, "status_code", None)
+    if status is None:
+        response = getattr(erro, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def eh_limite_taxa(erro: BaseException) -> bool:
+    return isinstance(erro, openai.RateLimitError) or _status(erro) == 429
+
+
+def eh_transitorio(erro: BaseException) -> bool:
+    """Erros que valem nova tentativa: limite, 5xx, timeout, conexão."""
+    if isinstance(erro, (openai.APIConnectionError, httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    return _status(erro) in STATUS_TRANSITORIOS
+
+
+def extrair_retry_after(erro: BaseException) -> Optional[float]:
+    """
+    Lê o tempo de espera sugerido: `retry-after-ms`, `retry-after`
+    (segundos ou data HTTP) ou o `retryDelay` do corpo de erro do Gemini.
+    """
+    response = getattr(erro, "response", None)
+    if response is None:
+        return None
+
+    headers = getattr(response, "headers", {}) or {}
+
+    valor = headers.get("retry-after-ms")
+    if valor:
+        try:
+            return float(valor) / 1000
+        except ValueError:
+            pass
+
+    valor = headers.get("retry-after")
+    if valor:
+        try:
+            return float(valor)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    try:
+        detalhes = response.json().get("error", {}).get("details", [])
+    except Exception:
+        return None
+
+    for detalhe in detalhes:
+        atraso = detalhe.get("retryDelay") if isinstance(detalhe, dict) else None
+        if atraso and atraso.endswith("s"):
+            try:
+                return float(atraso[:-1])
+            except ValueError:
+                pass
+
+    return None
+
+
+async def com_retentativas(
+    chamada: Callable[[], Awaitable],
+    limitador: LimitadorAdaptativo,
+    tentativas: int = RETRY_TENTATIVAS,
+    base: float = RETRY_BASE,
+    teto: float = RETRY_TETO
+):
+    """
+    Executa `chamada` respeitando o limitador e repetindo erros transitórios
+    com backoff exponencial com jitter (ou o Retry-After, quando houver).
+    """
+    for tentativa in range(tentativas):
+        await limitador.adquirir()
+
+        try:
+            resultado = await chamada()
+        except Exception as e:
+            if not eh_transitorio(e) or tentativa == tentativas - 1:
+                raise
+
+            retry_after = extrair_retry_after(e)
+            if eh_limite_taxa(e):
+                limitador.registrar_limite(retry_after)
+
+            espera = retry_after if retry_after is not None else random.uniform(0, min(teto, base * 2 ** tentativa))
+            await asyncio.sleep(min(espera, teto))
+            continue
+
+        limitador.registrar_sucesso()
+        return resultado
@@ -0,0 +1,162 @@
+"""
+🔎 Busca no Google via Serper, com cache por consulta e modo em lote
+"""
+
+import os
+import asyncio
+from typing import Optional
+
+import httpx
+
+from .cache import get_cache, chave_cache
+from .clients import get_http
+from .singleflight import get_singleflight
+
+
+SERPER_API_KEY = os.getenv("SERPER_API_KEY")
+SERPER_URL = "https://google.serper.dev/search"
+
+# Resultados de busca mudam devagar: 12h por padrão
+SERPER_CACHE_TTL = float(os.getenv("SERPER_CACHE_TTL", str(12 * 3600)))
+# Quantas consultas vão num único POST em lote (limite do provedor: 100)
+SERPER_LOTE_MAX = int(os.getenv("SERPER_LOTE_MAX", "100"))
+
+# Partes da resposta que valem guardar (o resto é eco da requisição)
+CAMPOS_RESULTADO = ("organic", "knowledgeGraph", "peopleAlsoAsk", "relatedSearches", "answerBox", "places")
+
+
+def consulta(q: str, gl: str = "br", hl: str = "pt-br", num: int = 10) -> dict:
+    """
+    Monta uma consulta no formato da API. A query é normalizada (espaços
+    e caixa) para que variações triviais caiam na mesma entrada do cache.
+    """
+    return {"q": " ".join(q.split()), "gl": gl, "hl": hl, "num": num}
+
+
+def chave_consulta(c: dict) -> str:
+    return chave_cache(c["q"].lower(), c["gl"], c["hl"], c["num"])
+
+
+async def buscar(q: str, gl: str = "br", hl: str = "pt-br", num: int = 10) -> Optional[dict]:
+    """
+    Uma busca, com cache e coalescência de buscas idênticas simultâneas.
+    Falhas não entram no cache.
+
+    Returns:
+        {"organic": [...], ...} ou None se não há SERPER_API_KEY
+
+    Raises:
+        httpx.HTTPError: falha de rede ou status de erro (ex: 403 chave
+        inválida, 429 cota esgotada)
+    """
+    if not SERPER_API_KEY:
+        return None
+
+    c = consulta(q, gl, hl, num)
+    chave = chave_consulta(c)
+
+    resultado = _cache().get(chave)
+    if resultado is not None:
+        return resultado
+
+    return await get_singleflight("serper").executar(chave, lambda: _buscar_e_guardar(c, chave))
+
+
+async def buscar_lote(consultas: list) -> list:
+    """
+    Várias buscas de uma vez (ex: marca, nicho + cidade, concorrentes).
+
+    As que estão no cache não vão para a rede; as demais seguem em POSTs
+    no formato em lote do Serper (lista de consultas, até SERPER_LOTE_MAX
+    por requisição). Se o lote falhar, cada consulta é refeita
+    individualmente, em paralelo.
+
+    Args:
+        consultas: dicts de `consulta(...)` ou strings (usam gl/hl/num padrão)
+
+    Returns:
+        Lista alinhada com `consultas`: resultado completo ou None
+    """
+    if not SERPER_API_KEY:
+        return [None] * len(consultas)
+
+    consultas = [consulta(c) if isinstance(c, str) else consulta(**c) for c in consultas]
+    chaves = [chave_consulta(c) for c in consultas]
+    resultados = [_cache().get(chave) for chave in chaves]
+
+    # Consultas repetidas dentro do lote vão uma vez só
+    pendentes: dict = {}
+    for c, chave, resultado in zip(consultas, chaves, resultados):
+        if resultado is None and chave not in pendentes:
+            pendentes[chave] = c
+
+    itens = list(pendentes.items())
+    blocos = [itens[i:i + SERPER_LOTE_MAX] for i in range(0, len(itens), SERPER_LOTE_MAX)]
+    obtidos: dict = {}
+    for bloco, respostas in zip(blocos, await asyncio.gather(*(_buscar_bloco(b) for b in blocos))):
+        for (chave, _), resposta in zip(bloco, respostas):
+            obtidos[chave] = resposta
+
+    return [
+        resultado if resultado is not None else obtidos.get(chave)
+        for chave, resultado in zip(chaves, resultados)
+    ]
+
+
+async def _buscar_bloco(bloco: list) -> list:
+    try:
+        response = await get_http("serper").post(
+            SERPER_URL,
+            headers={"X-API-KEY": SERPER_API_KEY, "Content-Type": "application/json"},
+            json=[c for _, c in bloco],
+            timeout=30.0
+        )
+        dados = response.json() if response.status_code == 200 else None
+    except Exception:
+        dados = None
+
+    if isinstance(dados, list) and len(dados) == len(bloco):
+        respostas = []
+        for (chave, _), item in zip(bloco, dados):
+            resultado = _resumir(item) if isinstance(item, dict) else None
+            _cache().set(chave, resultado)
+            respostas.append(resultado)
+        return respostas
+
+    # Lote recusado: uma requisição por consulta
+    async def individual(chave: str, c: dict) -> Optional[dict]:
+        try:
+            return await _buscar_e_guardar(c, chave)
+        except Exception:
+            return None
+
+    return await asyncio.gather(*(individual(chave, c) for chave, c in bloco))
+
+
+async def _buscar_e_guardar(c: dict, chave: str) -> dict:
+    response = await get_http("serper").post(
+        SERPER_URL,
+        headers={"X-API-KEY": SERPER_API_KEY, "Content-Type": "application/json"},
+        json=c,
+        timeout=10.0
+    )
+
+    # Erro sobe (e não fica em cache): o diagnóstico registra a falha da busca
+    if response.status_code != 200:
+        raise httpx.HTTPStatusError(
+            f"Serper: HTTP {response.status_code}", request=response.request, response=response
+        )
+
+    resultado = _resumir(response.json())
+    _cache().set(chave, resultado)
+    return resultado
+
+
+def _resumir(dados: dict) -> dict:
+    resultado = {campo: dados[campo] for campo in CAMPOS_RESULTADO if campo in dados}
+    resultado.setdefault("organic", [])
+    return resultado
+
+
+def _cache():
+    return get_cache("serper", ttl=SERPER_CACHE_TTL, max_itens=512)
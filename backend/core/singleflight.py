@@ -0,0 +1,113 @@
+"""
+🛫 Singleflight: chamadas idênticas e simultâneas compartilham uma só execução
+"""
+
+import os
+import copy
+import asyncio
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Optional
+
+from .cache import LRUCache
+
+
+# Por quanto tempo um resultado recém-calculado responde chamadas repetidas
+SINGLEFLIGHT_TTL = float(os.getenv("SINGLEFLIGHT_TTL", "60"))
+
+
+@dataclass
+class SingleFlightEstatisticas:
+    chamadas: int = 0
+    execucoes: int = 0
+    compartilhadas: int = 0
+    hits_recentes: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class SingleFlight:
+    """
+    Coalesce chamadas pela chave: enquanto uma execução está em voo, as
+    demais chamadas com a mesma chave aguardam o mesmo resultado. Depois
+    de concluída, o resultado fica num LRU curto (`ttl`) para absorver
+    envios repetidos.
+
+    Erros são repassados a todos que aguardavam e nunca ficam guardados.
+    A execução roda numa task própria: cancelar quem chamou primeiro não
+    cancela os demais.
+
+    Uso:
+        voos = get_singleflight("diagnostico")
+        resultado = await voos.executar(chave, lambda: diagnosticar(...))
+    """
+
+    def __init__(self, nome: str, ttl: float = SINGLEFLIGHT_TTL, max_itens: int = 256):
+        self.nome = nome
+        self.recentes = LRUCache(max_itens=max_itens, ttl=ttl)
+        self.stats = SingleFlightEstatisticas()
+        self._em_voo: dict = {}
+
+    async def executar(
+        self,
+        chave: str,
+        chamada: Callable[[], Awaitable[Any]],
+        guardar: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Retorna o resultado de `chamada()`, executando-a no máximo uma vez
+        por chave ao mesmo tempo.
+
+        `guardar(resultado)` decide se o resultado entra no LRU de
+        recentes (padrão: qualquer valor diferente de None).
+        """
+        self.stats.chamadas += 1
+
+        valor = self.recentes.get(chave)
+        if valor is not None:
+            self.stats.hits_recentes += 1
+            return copy.deepcopy(valor)
+
+        task = self._em_voo.get(chave)
+        if task is not None:
+            self.stats.compartilhadas += 1
+        else:
+            self.stats.execucoes += 1
+            task = asyncio.ensure_future(chamada())
+            self._em_voo[chave] = task
+            task.add_done_callback(lambda t: self._concluir(chave, t, guardar))
+
+        # Cada chamador recebe sua cópia: ninguém altera o resultado do outro
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _concluir(self, chave: str, task: asyncio.Future, guardar: Optional[Callable[[Any], bool]]):
+        if self._em_voo.get(chave) is task:
+            del self._em_voo[chave]
+
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        valor = task.result()
+        if valor is not None and (guardar is None or guardar(valor)):
+            self.recentes.set(chave, valor)
+
+    def esquecer(self, chave: str) -> None:
+        """Descarta o resultado recente da chave (ex: usuário pediu atualização)."""
+        self.recentes.delete(chave)
+
+
+_voos: dict = {}
+
+
+def get_singleflight(nome: str, ttl: float = SINGLEFLIGHT_TTL, max_itens: int = 256) -> SingleFlight:
+    """
+    Retorna o singleflight do nome, criando na primeira chamada.
+    """
+    if nome not in _voos:
+        _voos[nome] = SingleFlight(nome, ttl=ttl, max_itens=max_itens)
+    return _voos[nome]
+
+
+def estatisticas_singleflight() -> dict:
+    """Contadores de chamadas coalescidas de todos os singleflights."""
+    return {nome: voo.stats.to_dict() for nome, voo in _voos.items()}
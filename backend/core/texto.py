@@ -0,0 +1,18 @@
+"""
+🔤 Normalização de texto para comparação (caixa e acentos)
+"""
+
+import unicodedata
+
+
+def sem_acentos(texto: str) -> str:
+    """
+    Minúsculas e sem acentos, para comparar palavras escritas de jeitos
+    diferentes.
+
+    Ex: "Soluções" -> "solucoes"
+    """
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", (texto or "").lower())
+        if not unicodedata.combining(c)
+    )
@@ -0,0 +1,40 @@
+"""
+🔗 Normalização de URLs (chave de cache, deduplicação)
+"""
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+PARAMETROS_RASTREIO = {"gclid", "fbclid", "mc_cid", "mc_eid", "ref"}
+PORTAS_PADRAO = {"http": 80, "https": 443}
+
+
+def normalizar_url(url: str) -> str:
+    """
+    Normaliza uma URL para comparação: esquema e host em minúsculas, sem
+    porta padrão, sem fragmento, sem parâmetros de rastreio, query
+    ordenada e sem barra final (exceto na raiz).
+
+    Ex: "Datarisk.io/Sobre/?utm_source=x#time" -> "https://datarisk.io/Sobre"
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+
+    partes = urlsplit(url)
+    esquema = partes.scheme.lower()
+    host = (partes.hostname or "").lower()
+
+    if partes.port and partes.port != PORTAS_PADRAO.get(esquema):
+        host = f"{host}:{partes.port}"
+
+    caminho = partes.path or "/"
+    if len(caminho) > 1:
+        caminho = caminho.rstrip("/") or "/"
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(partes.query, keep_blank_values=True)
+        if not (k.lower().startswith("utm_") or k.lower() in PARAMETROS_RASTREIO)
+    )
+
+    return urlunsplit((esquema, host, caminho, urlencode(query), ""))
@@ -1,9 +1,24 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from openai import OpenAI
 
-app = FastAPI(title="Harpia GEO")
+from core.clients import get_openai, iniciar_clientes, fechar_clientes, estatisticas_pools
+from core.cache import estatisticas_caches
+from core.rate_limit import estado_limitadores
+from core.singleflight import estatisticas_singleflight
+from store import estatisticas_stores
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clientes dos provedores são criados uma vez e compartilhados
+    await iniciar_clientes()
+    yield
+    await fechar_clientes()
+
+
+app = FastAPI(title="Harpia GEO", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,16 +27,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 @app.get("/")
 def root():
     return {"status": "ok", "service": "Harpia GEO"}
 
+@app.get("/api/metrics")
+def metrics():
+    return {
+        "pools": estatisticas_pools(),
+        "caches": estatisticas_caches(),
+        "limitadores": estado_limitadores(),
+        "singleflight": estatisticas_singleflight(),
+        "store": estatisticas_stores()
+    }
+
 @app.post("/api/chat")
 async def chat(request: Request):
     data = await request.json()
-    response = client.chat.completions.create(
+    response = await get_openai().chat.completions.create(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": "Voce e o Harpia, assistente de GEO."},
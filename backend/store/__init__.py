@@ -1,3 +1,3 @@
-from .supabase_store import SupabaseStore
+from .supabase_store import SupabaseStore, estatisticas_stores
 
-__all__ = ["SupabaseStore"]
+__all__ = ["SupabaseStore", "estatisticas_stores"]
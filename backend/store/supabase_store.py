@@ -2,11 +2,23 @@
 🗄️ Store do Supabase para persistência de dados
 """
 
+import os
+import copy
 import json
-from typing import Optional, List
+import base64
+import binascii
+import time
+import asyncio
+import weakref
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from typing import Awaitable, Callable, Optional, List
 from datetime import datetime
-from supabase import create_client, Client
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+from postgrest.exceptions import APIError
 from chatkit.store import Store
+
+from core.cache import get_cache
 from chatkit.types import (
     ThreadMetadata,
     MessageItem,
@@ -14,13 +26,192 @@ from chatkit.types import (
 )
 
 
+# Timeout por chamada (consultas) e por upload/download de arquivo
+STORE_TIMEOUT = float(os.getenv("STORE_TIMEOUT", "10"))
+STORE_TIMEOUT_ARQUIVOS = float(os.getenv("STORE_TIMEOUT_ARQUIVOS", "60"))
+# Chamadas simultâneas ao Supabase; as demais esperam a vez
+STORE_CONCORRENCIA = int(os.getenv("STORE_CONCORRENCIA", "20"))
+
+# Código do PostgREST para função RPC inexistente
+FUNCAO_INEXISTENTE = "PGRST202"
+
+# Cache de leitura (só em memória, por processo): outros workers veem
+# mudanças em no máximo STORE_CACHE_TTL segundos
+STORE_CACHE_TTL = float(os.getenv("STORE_CACHE_TTL", "60"))
+STORE_CACHE_MAX_ITENS = int(os.getenv("STORE_CACHE_MAX_ITENS", "1024"))
+# Primeiras páginas de list_threads que ficam em cache
+STORE_CACHE_PAGINAS = int(os.getenv("STORE_CACHE_PAGINAS", "1"))
+
+
+@dataclass
+class MetricasStore:
+    chamadas: int = 0
+    em_voo: int = 0
+    aguardando: int = 0
+    timeouts: int = 0
+    erros: int = 0
+    tempo_total: float = 0.0
+
+    def to_dict(self) -> dict:
+        dados = asdict(self)
+        dados["latencia_media_ms"] = round(self.tempo_total / self.chamadas * 1000, 2) if self.chamadas else 0.0
+        del dados["tempo_total"]
+        return dados
+
+
+@dataclass
+class MetricasLeitura:
+    chamadas: int = 0
+    hits: int = 0
+    tempo_hits: float = 0.0
+    tempo_misses: float = 0.0
+
+    def registrar(self, acerto: bool, tempo: float) -> None:
+        self.chamadas += 1
+        if acerto:
+            self.hits += 1
+            self.tempo_hits += tempo
+        else:
+            self.tempo_misses += tempo
+
+    def to_dict(self) -> dict:
+        misses = self.chamadas - self.hits
+        return {
+            "chamadas": self.chamadas,
+            "hits": self.hits,
+            "taxa_acerto": round(self.hits / self.chamadas, 3) if self.chamadas else 0,
+            "latencia_hit_ms": round(self.tempo_hits / self.hits * 1000, 3) if self.hits else 0.0,
+            "latencia_miss_ms": round(self.tempo_misses / misses * 1000, 2) if misses else 0.0
+        }
+
+
+_stores: "weakref.WeakSet" = weakref.WeakSet()
+
+
 class SupabaseStore(Store):
     """
     Implementação do Store usando Supabase como backend.
+
+    Usa o cliente assíncrono do Supabase: nenhuma chamada bloqueia o
+    event loop, então uma consulta lenta não trava o streaming dos outros
+    chats. O cliente (e seu pool de conexões HTTP) é criado na primeira
+    chamada e compartilhado; cada chamada passa por `_executar`, que
+    limita a concorrência e aplica o timeout.
+
+    `get_thread`, `get_analise` e as primeiras páginas de `list_threads`
+    passam por um cache LRU + TTL em memória, invalidado nas escritas
+    deste processo.
     """
 
-    def __init__(self, supabase_url: str, supabase_key: str):
-        self.client: Client = create_client(supabase_url, supabase_key)
+    def __init__(
+        self,
+        supabase_url: str,
+        supabase_key: str,
+        timeout: float = STORE_TIMEOUT,
+        concorrencia: int = STORE_CONCORRENCIA
+    ):
+        self.supabase_url = supabase_url
+        self.supabase_key = supabase_key
+        self.timeout = timeout
+        self.client: Optional[AsyncClient] = None
+        self.metricas = MetricasStore()
+        self._criando = asyncio.Lock()
+        self._limite = asyncio.Semaphore(concorrencia)
+        # Desligado na primeira vez que o banco não tiver a função
+        self._rpc_salvar_analise = True
+
+        self._cache_threads = get_cache("store_threads", STORE_CACHE_TTL, STORE_CACHE_MAX_ITENS, persistente=False)
+        self._cache_listas = get_cache("store_listas", STORE_CACHE_TTL, STORE_CACHE_MAX_ITENS, persistente=False)
+        self._cache_analises = get_cache("store_analises", STORE_CACHE_TTL, STORE_CACHE_MAX_ITENS, persistente=False)
+        self.leituras: dict = defaultdict(MetricasLeitura)
+        # Incrementada a cada invalidação: leitura que começou antes de uma
+        # escrita não guarda o valor antigo no cache
+        self._versao = 0
+        _stores.add(self)
+
+    async def _cliente(self) -> AsyncClient:
+        if self.client is None:
+            async with self._criando:
+                if self.client is None:
+                    self.client = await acreate_client(
+                        self.supabase_url,
+                        self.supabase_key,
+                        options=AsyncClientOptions(
+                            postgrest_client_timeout=self.timeout,
+                            storage_client_timeout=STORE_TIMEOUT_ARQUIVOS
+                        )
+                    )
+        return self.client
+
+    async def _executar(
+        self,
+        chamada: Callable[[AsyncClient], Awaitable],
+        timeout: Optional[float] = None
+    ):
+        """
+        Executa `chamada(client)` com limite de concorrência e timeout.
+
+        Ex:
+            result = await self._executar(lambda c: c.table("threads").select("*").execute())
+        """
+        client = await self._cliente()
+        timeout = timeout or self.timeout
+
+        self.metricas.aguardando += 1
+        try:
+            await self._limite.acquire()
+        finally:
+            self.metricas.aguardando -= 1
+
+        self.metricas.em_voo += 1
+        inicio = time.perf_counter()
+        try:
+            return await asyncio.wait_for(chamada(client), timeout)
+        except asyncio.TimeoutError:
+            self.metricas.timeouts += 1
+            raise TimeoutError(f"Supabase não respondeu em {timeout:g}s") from None
+        except Exception:
+            self.metricas.erros += 1
+            raise
+        finally:
+            self._limite.release()
+            self.metricas.em_voo -= 1
+            self.metricas.chamadas += 1
+            self.metricas.tempo_total += time.perf_counter() - inicio
+
+    async def _ler(self, nome: str, cache, chave: str, buscar: Callable[[], Awaitable]):
+        """
+        Leitura com cache: retorna o valor de `cache` ou de `buscar()`,
+        guardando-o. Registra acerto e latência em `self.leituras[nome]`.
+        """
+        inicio = time.perf_counter()
+        valor = cache.get(chave)
+        acerto = valor is not None
+
+        if not acerto:
+            versao = self._versao
+            valor = await buscar()
+            if versao == self._versao:
+                cache.set(chave, valor)
+
+        self.leituras[nome].registrar(acerto, time.perf_counter() - inicio)
+        # Cópia: quem recebe pode alterar o resultado sem mexer no cache
+        return copy.deepcopy(valor)
+
+    def _invalidar(self, thread_id: Optional[str] = None, analise_id: Optional[str] = None) -> None:
+        self._versao += 1
+        if thread_id:
+            self._cache_threads.delete(thread_id)
+            # Qualquer mudança de thread pode mexer em qualquer listagem
+            self._cache_listas.limpar()
+        if analise_id:
+            self._cache_analises.delete(analise_id)
+
+    def estatisticas(self) -> dict:
+        return {
+            "supabase": self.metricas.to_dict(),
+            "leituras": {nome: m.to_dict() for nome, m in self.leituras.items()}
+        }
 
     # ==================== THREADS ====================
 
@@ -33,7 +224,8 @@ class SupabaseStore(Store):
             "created_at": datetime.utcnow().isoformat()
         }
 
-        result = self.client.table("threads").insert(data).execute()
+        result = await self._executar(lambda c: c.table("threads").insert(data).execute())
+        self._invalidar(thread_id=thread.id)
 
         if result.data:
             return thread
@@ -42,15 +234,14 @@ class SupabaseStore(Store):
 
     async def get_thread(self, thread_id: str) -> Optional[ThreadMetadata]:
         """Busca uma thread pelo ID."""
-        result = self.client.table("threads").select("*").eq("id", thread_id).execute()
+        async def buscar():
+            result = await self._executar(lambda c: c.table("threads").select("*").eq("id", thread_id).execute())
+            return result.data[0] if result.data else None
 
-        if result.data and len(result.data) > 0:
-            row = result.data[0]
-            return ThreadMetadata(
-                id=row["id"],
-                title=row.get("title"),
-                metadata=json.loads(row.get("metadata", "{}"))
-            )
+        row = await self._ler("get_thread", self._cache_threads, thread_id, buscar)
+
+        if row is not None:
+            return _thread(row)
 
         return None
 
@@ -62,7 +253,8 @@ class SupabaseStore(Store):
             "updated_at": datetime.utcnow().isoformat()
         }
 
-        result = self.client.table("threads").update(data).eq("id", thread.id).execute()
+        result = await self._executar(lambda c: c.table("threads").update(data).eq("id", thread.id).execute())
+        self._invalidar(thread_id=thread.id)
 
         if result.data:
             return thread
@@ -71,7 +263,8 @@ class SupabaseStore(Store):
 
     async def delete_thread(self, thread_id: str) -> None:
         """Deleta uma thread."""
-        self.client.table("threads").delete().eq("id", thread_id).execute()
+        await self._executar(lambda c: c.table("threads").delete().eq("id", thread_id).execute())
+        self._invalidar(thread_id=thread_id)
 
     async def list_threads(
         self,
@@ -80,22 +273,56 @@ class SupabaseStore(Store):
         offset: int = 0
     ) -> List[ThreadMetadata]:
         """Lista threads, opcionalmente filtradas por user_id."""
-        query = self.client.table("threads").select("*")
+        def consulta(c: AsyncClient):
+            query = c.table("threads").select("*")
+            if user_id:
+                query = query.eq("user_id", user_id)
+            return query.order("created_at", desc=True).order("id", desc=True).range(offset, offset + limit - 1).execute()
 
-        if user_id:
-            query = query.eq("user_id", user_id)
+        async def buscar():
+            result = await self._executar(consulta)
+            return result.data or []
 
-        result = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+        if offset < limit * STORE_CACHE_PAGINAS and offset % limit == 0:
+            rows = await self._ler("list_threads", self._cache_listas, f"{user_id}:{limit}:{offset}", buscar)
+        else:
+            rows = await buscar()
 
-        threads = []
-        for row in result.data or []:
-            threads.append(ThreadMetadata(
-                id=row["id"],
-                title=row.get("title"),
-                metadata=json.loads(row.get("metadata", "{}"))
-            ))
+        return [_thread(row) for row in rows]
 
-        return threads
+    async def list_threads_pagina(
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> tuple:
+        """
+        Lista threads por keyset em (created_at, id), mais recentes
+        primeiro. Cada página custa o mesmo, não importa a profundidade
+        (ao contrário do `offset` de list_threads).
+
+        Returns:
+            (threads, cursor da próxima página ou None se acabou)
+        """
+        def consulta(c: AsyncClient):
+            query = c.table("threads").select("*")
+            if user_id:
+                query = query.eq("user_id", user_id)
+            if cursor:
+                query = _depois_do_cursor(query, cursor)
+            return query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1).execute()
+
+        async def buscar():
+            result = await self._executar(consulta)
+            return result.data or []
+
+        if cursor is None and STORE_CACHE_PAGINAS > 0:
+            rows = await self._ler("list_threads", self._cache_listas, f"{user_id}:{limit}:keyset", buscar)
+        else:
+            rows = await buscar()
+
+        rows, proximo = _pagina(rows, limit)
+        return [_thread(row) for row in rows], proximo
 
     # ==================== MESSAGES ====================
 
@@ -110,7 +337,7 @@ class SupabaseStore(Store):
             "created_at": datetime.utcnow().isoformat()
         }
 
-        result = self.client.table("messages").insert(data).execute()
+        result = await self._executar(lambda c: c.table("messages").insert(data).execute())
 
         if result.data:
             return message
@@ -123,30 +350,54 @@ class SupabaseStore(Store):
         limit: int = 100,
         before_id: Optional[str] = None
     ) -> List[MessageItem]:
-        """Busca mensagens de uma thread."""
-        query = self.client.table("messages").select("*").eq("thread_id", thread_id)
-
+        """
+        Busca mensagens de uma thread: as primeiras `limit` ou, com
+        `before_id`, as `limit` imediatamente anteriores a essa mensagem.
+        `before_id` de outra thread (ou inexistente) retorna lista vazia.
+        """
         if before_id:
-            # Busca mensagens antes de um ID específico
-            query = query.lt("created_at", before_id)
-
-        result = query.order("created_at", desc=False).limit(limit).execute()
-
-        messages = []
-        for row in result.data or []:
-            content = row.get("content", "")
-            try:
-                content = json.loads(content)
-            except (json.JSONDecodeError, TypeError):
-                pass
+            # Posição da mensagem de referência vira o cursor do keyset
+            result = await self._executar(
+                lambda c: c.table("messages").select("created_at, id")
+                .eq("id", before_id).eq("thread_id", thread_id).execute()
+            )
+            if not result.data:
+                return []
+            messages, _ = await self.get_messages_pagina(thread_id, limit, _codificar_cursor(result.data[0]))
+            return messages
+
+        result = await self._executar(
+            lambda c: c.table("messages").select("*").eq("thread_id", thread_id)
+            .order("created_at", desc=False).order("id", desc=False).limit(limit).execute()
+        )
 
-            messages.append(MessageItem(
-                id=row["id"],
-                role=row["role"],
-                content=content
-            ))
+        return [_mensagem(row) for row in result.data or []]
 
-        return messages
+    async def get_messages_pagina(
+        self,
+        thread_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> tuple:
+        """
+        Página de mensagens por keyset em (created_at, id): sem cursor, as
+        mais recentes; com cursor, as anteriores a ele. Usa o índice
+        (thread_id, created_at, id), então o custo por página é constante
+        mesmo em threads com milhares de mensagens.
+
+        Returns:
+            (mensagens em ordem cronológica, cursor das anteriores ou None)
+        """
+        def consulta(c: AsyncClient):
+            query = c.table("messages").select("*").eq("thread_id", thread_id)
+            if cursor:
+                query = _depois_do_cursor(query, cursor)
+            return query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1).execute()
+
+        result = await self._executar(consulta)
+
+        rows, proximo = _pagina(result.data or [], limit)
+        return [_mensagem(row) for row in reversed(rows)], proximo
 
     # ==================== FILES ====================
 
@@ -155,10 +406,13 @@ class SupabaseStore(Store):
         # Upload para Supabase Storage
         path = f"files/{file.id}/{file.name}"
 
-        self.client.storage.from_("harpia-files").upload(
-            path,
-            content,
-            file_options={"content-type": file.mime_type or "application/octet-stream"}
+        await self._executar(
+            lambda c: c.storage.from_("harpia-files").upload(
+                path,
+                content,
+                file_options={"content-type": file.mime_type or "application/octet-stream"}
+            ),
+            timeout=STORE_TIMEOUT_ARQUIVOS
         )
 
         # Salva metadados
@@ -171,17 +425,20 @@ class SupabaseStore(Store):
             "created_at": datetime.utcnow().isoformat()
         }
 
-        self.client.table("files").insert(data).execute()
+        await self._executar(lambda c: c.table("files").insert(data).execute())
 
         return file
 
     async def get_file(self, file_id: str) -> Optional[bytes]:
         """Busca conteúdo de um arquivo."""
-        result = self.client.table("files").select("path").eq("id", file_id).execute()
+        result = await self._executar(lambda c: c.table("files").select("path").eq("id", file_id).execute())
 
         if result.data and len(result.data) > 0:
             path = result.data[0]["path"]
-            response = self.client.storage.from_("harpia-files").download(path)
+            response = await self._executar(
+                lambda c: c.storage.from_("harpia-files").download(path),
+                timeout=STORE_TIMEOUT_ARQUIVOS
+            )
             return response
 
         return None
@@ -196,8 +453,13 @@ class SupabaseStore(Store):
         dados: dict,
         prompts: list
     ) -> str:
-        """Salva uma análise completa."""
-        # Salva análise
+        """
+        Salva uma análise completa com seus prompts.
+
+        Usa a função `salvar_analise` do banco (supabase/migrations): análise
+        e prompts numa transação, num round trip só. Se a função ainda não
+        existir, cai para dois inserts (análise + prompts em lote).
+        """
         analise_data = {
             "thread_id": thread_id,
             "empresa": empresa,
@@ -206,14 +468,8 @@ class SupabaseStore(Store):
             "status": "completed",
             "created_at": datetime.utcnow().isoformat()
         }
-
-        result = self.client.table("analises").insert(analise_data).execute()
-        analise_id = result.data[0]["id"]
-
-        # Salva prompts
-        for prompt in prompts:
-            prompt_data = {
-                "analise_id": analise_id,
+        prompts_data = [
+            {
                 "ordem": prompt.get("ordem"),
                 "texto": prompt.get("texto"),
                 "categoria": prompt.get("categoria"),
@@ -221,31 +477,56 @@ class SupabaseStore(Store):
                 "persona": prompt.get("persona"),
                 "formato_esperado": prompt.get("formato_esperado")
             }
-            self.client.table("prompts").insert(prompt_data).execute()
+            for prompt in prompts
+        ]
 
+        if self._rpc_salvar_analise:
+            try:
+                result = await self._executar(
+                    lambda c: c.rpc("salvar_analise", {"p_analise": analise_data, "p_prompts": prompts_data}).execute()
+                )
+                self._invalidar(analise_id=result.data)
+                return result.data
+            except APIError as e:
+                if e.code != FUNCAO_INEXISTENTE:
+                    raise
+                print("⚠️ Função salvar_analise não encontrada no banco, salvando análise com inserts em lote")
+                self._rpc_salvar_analise = False
+
+        result = await self._executar(lambda c: c.table("analises").insert(analise_data).execute())
+        analise_id = result.data[0]["id"]
+
+        if prompts_data:
+            linhas = [{**prompt, "analise_id": analise_id} for prompt in prompts_data]
+            await self._executar(lambda c: c.table("prompts").insert(linhas).execute())
+
+        self._invalidar(analise_id=analise_id)
         return analise_id
 
     async def get_analise(self, analise_id: str) -> Optional[dict]:
-        """Busca uma análise pelo ID."""
-        result = self.client.table("analises").select("*").eq("id", analise_id).execute()
+        """
+        Busca uma análise pelo ID, com seus prompts na mesma consulta
+        (select embutido do PostgREST).
+        """
+        async def buscar():
+            result = await self._executar(
+                lambda c: c.table("analises").select("*, prompts(*)").eq("id", analise_id).execute()
+            )
+            if not result.data:
+                return None
 
-        if result.data and len(result.data) > 0:
             analise = result.data[0]
-
-            # Busca prompts
-            prompts_result = self.client.table("prompts").select("*").eq("analise_id", analise_id).order("ordem").execute()
-
             return {
                 "id": analise["id"],
                 "empresa": analise["empresa"],
                 "site": analise["site"],
                 "dados": json.loads(analise.get("dados", "{}")),
                 "status": analise["status"],
-                "prompts": prompts_result.data or [],
+                "prompts": sorted(analise.get("prompts") or [], key=lambda p: p.get("ordem") or 0),
                 "created_at": analise["created_at"]
             }
 
-        return None
+        return await self._ler("get_analise", self._cache_analises, analise_id, buscar)
 
     async def save_teste_visibilidade(
         self,
@@ -253,13 +534,127 @@ class SupabaseStore(Store):
         resultados: dict
     ) -> str:
         """Salva resultado de teste de visibilidade."""
-        data = {
-            "analise_id": analise_id,
-            "score_geral": resultados.get("score_geral", 0),
-            "resultados": json.dumps(resultados),
-            "created_at": datetime.utcnow().isoformat()
-        }
+        ids = await self.save_testes_visibilidade([(analise_id, resultados)])
+        return ids[0]
+
+    async def save_testes_visibilidade(self, testes: List[tuple]) -> List[str]:
+        """
+        Salva vários testes de visibilidade (ex: uma rodada de
+        monitoramento) num único insert em lote.
+
+        Args:
+            testes: Pares (analise_id, resultados)
+
+        Returns:
+            IDs dos testes, na mesma ordem
+        """
+        if not testes:
+            return []
+
+        agora = datetime.utcnow().isoformat()
+        linhas = [
+            {
+                "analise_id": analise_id,
+                "score_geral": resultados.get("score_geral", 0),
+                "resultados": json.dumps(resultados),
+                "created_at": agora
+            }
+            for analise_id, resultados in testes
+        ]
+
+        result = await self._executar(lambda c: c.table("testes_visibilidade").insert(linhas).execute())
+
+        return [row["id"] for row in result.data]
+
+    async def get_ultimo_teste_visibilidade(self, analise_id: str) -> Optional[dict]:
+        """Busca o teste de visibilidade mais recente de uma análise."""
+        result = await self._executar(
+            lambda c: c.table("testes_visibilidade")
+            .select("*")
+            .eq("analise_id", analise_id)
+            .order("created_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+
+        if result.data and len(result.data) > 0:
+            teste = result.data[0]
+            return {
+                "id": teste["id"],
+                "score_geral": teste["score_geral"],
+                "resultados": json.loads(teste.get("resultados", "{}")),
+                "created_at": teste["created_at"]
+            }
+
+        return None
+
+
+def _thread(row: dict) -> ThreadMetadata:
+    return ThreadMetadata(
+        id=row["id"],
+        title=row.get("title"),
+        metadata=json.loads(row.get("metadata", "{}"))
+    )
+
+
+def _mensagem(row: dict) -> MessageItem:
+    content = row.get("content", "")
+    try:
+        content = json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    return MessageItem(
+        id=row["id"],
+        role=row["role"],
+        content=content
+    )
+
+
+# ==================== PAGINAÇÃO (keyset) ====================
+
+def _codificar_cursor(row: dict) -> str:
+    """Cursor opaco (base64 url-safe) com a posição (created_at, id) da linha."""
+    bruto = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor: str) -> tuple:
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, item_id = json.loads(bruto)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError("Cursor de paginação inválido") from None
+    return str(created_at), str(item_id)
+
+
+def _depois_do_cursor(query, cursor: str):
+    """
+    Linhas depois do cursor na ordem (created_at DESC, id DESC):
+    created_at < c OR (created_at = c AND id < i).
+    """
+    created_at, item_id = _decodificar_cursor(cursor)
+    c, i = _literal(created_at), _literal(item_id)
+    # O `lte` redundante dá ao planner um intervalo no índice antes do OR
+    return query.lte("created_at", created_at).or_(f"created_at.lt.{c},and(created_at.eq.{c},id.lt.{i})")
+
+
+def _literal(valor: str) -> str:
+    """Valor entre aspas para filtros lógicos do PostgREST (timestamps têm ':' e '+')."""
+    return '"' + valor.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _pagina(rows: list, limit: int) -> tuple:
+    """
+    Consultas pedem `limit + 1` linhas: a extra só indica que há próxima
+    página, cujo cursor é a última linha desta.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, _codificar_cursor(rows[-1])
 
-        result = self.client.table("testes_visibilidade").insert(data).execute()
 
-        return result.data[0]["id"]
+def estatisticas_stores() -> dict:
+    """Métricas de chamadas e de cache de leitura dos stores do processo."""
+    return {f"{type(store).__name__}#{i}": store.estatisticas() for i, store in enumerate(_stores)}
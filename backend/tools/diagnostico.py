@@ -3,13 +3,39 @@
 """
 
 import os
+import re
+import time
+import asyncio
+import hashlib
+from functools import partial
+
 import httpx
 from agents import function_tool
 from typing import Optional
 
+from core.clients import get_http
+from core.cache import get_cache, chave_cache
+from core.urls import normalizar_url
+from core.html_head import LeitorHead
+from core.extrator import LeitorConteudo, extrair_local
+from core.crawler import Crawler
+from core.singleflight import get_singleflight
+from core.serper import buscar
+
 
 FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY")
-SERPER_API_KEY = os.getenv("SERPER_API_KEY")  # Para web search
+
+# Prazo total do diagnóstico (scrape e busca rodam em paralelo)
+DIAGNOSTICO_TIMEOUT = float(os.getenv("DIAGNOSTICO_TIMEOUT", "35"))
+
+# Cache de scrape: sem requisição dentro do TTL, revalidação depois
+SCRAPE_CACHE_TTL = float(os.getenv("SCRAPE_CACHE_TTL", "86400"))
+SCRAPE_CACHE_RETENCAO = float(os.getenv("SCRAPE_CACHE_RETENCAO", str(90 * 86400)))
+SCRAPE_HTML_MAX = int(os.getenv("SCRAPE_HTML_MAX", str(512 * 1024)))
+HTML_HEAD_MAX = int(os.getenv("HTML_HEAD_MAX", str(256 * 1024)))
+
+# Abaixo desta confiança a extração local é refeita pela Firecrawl (se configurada)
+EXTRATOR_CONFIANCA_MIN = float(os.getenv("EXTRATOR_CONFIANCA_MIN", "0.6"))
 
 
 @function_tool
@@ -27,12 +53,25 @@ async def diagnostico_empresa(
         nicho: Nicho opcional (ex: "fintech", "saas")
 
     Returns:
-        Dados extraídos do site e contexto da web
+        Dados extraídos do site (home e páginas de serviços, sobre e
+        preços, listadas em `paginas`) e contexto da web, com tempo e
+        erro de cada fonte em `tempos_ms` e `erros`
     """
     # Normaliza URL
     if not site.startswith("http"):
         site = f"https://{site}"
 
+    # Envio duplicado do formulário ou várias pessoas analisando a mesma
+    # empresa: uma só execução, compartilhada
+    chave = chave_cache(normalizar_url(site), _normalizar_termo(empresa), _normalizar_termo(nicho or ""))
+    return await get_singleflight("diagnostico").executar(
+        chave,
+        lambda: _diagnosticar(empresa, site, nicho),
+        guardar=lambda resultado: not resultado["erros"]
+    )
+
+
+async def _diagnosticar(empresa: str, site: str, nicho: Optional[str]) -> dict:
     resultado = {
         "empresa": empresa,
         "site": site,
@@ -43,140 +82,361 @@ async def diagnostico_empresa(
         "publico_alvo": None,
         "contexto_mercado": None,
         "concorrentes": [],
+        "paginas": [],
+        "tempos_ms": {},
+        "erros": [],
         "erro": None
     }
 
-    try:
-        # 1. Scrape do site com Firecrawl
-        site_data = await scrape_site(site)
+    # Scrape do site e busca na web são independentes: rodam juntos,
+    # com um prazo total compartilhado
+    etapas = {
+        "site": asyncio.create_task(_cronometrar(rastrear_site(site, empresa))),
+        "busca": asyncio.create_task(_cronometrar(search_web(f"{empresa} {nicho or ''} Brasil")))
+    }
 
-        if site_data:
-            resultado["descricao"] = site_data.get("description", "")
-            resultado["servicos"] = site_data.get("services", [])
-            resultado["diferenciais"] = site_data.get("differentials", [])
-            resultado["publico_alvo"] = site_data.get("target_audience", "")
+    try:
+        _, pendentes = await asyncio.wait(etapas.values(), timeout=DIAGNOSTICO_TIMEOUT)
+    finally:
+        # Etapas que estouraram o prazo (ou diagnóstico cancelado) param aqui
+        for task in etapas.values():
+            if not task.done():
+                task.cancel()
+
+    # Espera o cancelamento ser processado antes de ler os resultados
+    await asyncio.gather(*pendentes, return_exceptions=True)
+
+    saidas = {}
+    for fonte, task in etapas.items():
+        if task in pendentes:
+            resultado["tempos_ms"][fonte] = round(DIAGNOSTICO_TIMEOUT * 1000)
+            resultado["erros"].append({"fonte": fonte, "erro": f"timeout após {DIAGNOSTICO_TIMEOUT:g}s"})
+            continue
+
+        valor, erro, tempo_ms = task.result()
+        resultado["tempos_ms"][fonte] = tempo_ms
+        if erro is not None:
+            resultado["erros"].append({"fonte": fonte, "erro": str(erro) or type(erro).__name__})
+        else:
+            saidas[fonte] = valor
+
+    # 1. Dados do site
+    site_data = saidas.get("site")
+    if site_data:
+        resultado["descricao"] = site_data.get("description", "")
+        resultado["servicos"] = site_data.get("services", [])
+        resultado["diferenciais"] = site_data.get("differentials", [])
+        resultado["publico_alvo"] = site_data.get("target_audience", "")
+        resultado["paginas"] = site_data.get("paginas", [])
+
+        # Falha na home é falha do site (páginas internas adivinhadas
+        # podem não existir sem que isso seja erro)
+        home = next((p for p in resultado["paginas"] if p["categoria"] == "home"), None)
+        if home and home["erro"]:
+            resultado["erros"].append({"fonte": "site", "erro": home["erro"]})
+
+    # 2. Contexto da web
+    contexto = saidas.get("busca")
+    if contexto:
+        resultado["contexto_mercado"] = contexto.get("summary", "")
+        resultado["concorrentes"] = contexto.get("competitors", [])
+
+    if resultado["erros"]:
+        resultado["erro"] = "; ".join(f"{e['fonte']}: {e['erro']}" for e in resultado["erros"])
 
-        # 2. Busca contexto na web
-        contexto = await search_web(f"{empresa} {nicho or ''} Brasil")
+    return resultado
 
-        if contexto:
-            resultado["contexto_mercado"] = contexto.get("summary", "")
-            resultado["concorrentes"] = contexto.get("competitors", [])
 
+async def _cronometrar(coro) -> tuple:
+    """
+    Aguarda uma etapa e retorna (valor, erro, tempo em ms).
+    """
+    inicio = time.perf_counter()
+    try:
+        valor = await coro
+        erro = None
     except Exception as e:
-        resultado["erro"] = str(e)
+        valor, erro = None, e
+    return valor, erro, round((time.perf_counter() - inicio) * 1000)
 
-    return resultado
 
+async def rastrear_site(site: str, empresa: str) -> dict:
+    """
+    Rastreia a home e as páginas mais relevantes do site (ver
+    core/crawler.py) e junta os extracts num só. Só a home pode cair
+    para a Firecrawl (uma chamada por diagnóstico, no máximo); as demais
+    páginas usam apenas a extração local.
+    """
+    crawler = Crawler(partial(scrape_site, firecrawl=False), extrair_home=scrape_site)
+    paginas = await crawler.rastrear(site)
+    return mesclar_paginas(paginas, empresa)
 
-async def scrape_site(url: str) -> dict:
-    """
-    Faz scrape do site usando Firecrawl API.
-    """
-    if not FIRECRAWL_API_KEY:
-        # Fallback: scrape básico
-        return await scrape_basico(url)
-
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://api.firecrawl.dev/v1/scrape",
-            headers={
-                "Authorization": f"Bearer {FIRECRAWL_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "url": url,
-                "formats": ["markdown", "extract"],
-                "extract": {
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "description": {"type": "string"},
-                            "services": {"type": "array", "items": {"type": "string"}},
-                            "differentials": {"type": "array", "items": {"type": "string"}},
-                            "target_audience": {"type": "string"}
-                        }
-                    }
-                }
-            },
-            timeout=30.0
-        )
 
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("data", {}).get("extract", {})
+def mesclar_paginas(paginas: list, empresa: str) -> dict:
+    """
+    Junta os extracts das páginas rastreadas: descrição e público da home
+    (ou da página "sobre"), serviços e diferenciais de todas, sem
+    repetição. Sem serviços extraídos, o título de uma página de serviço
+    vira o nome do serviço.
+    """
+    mesclado = {
+        "description": "",
+        "services": [],
+        "differentials": [],
+        "target_audience": "",
+        "paginas": []
+    }
+    vistos = set()
+
+    def adicionar(campo: str, itens):
+        for item in itens or []:
+            if isinstance(item, str) and item.strip() and item.strip().lower() not in vistos:
+                vistos.add(item.strip().lower())
+                mesclado[campo].append(item.strip())
 
-        return {}
+    # Home primeiro, depois "sobre": são as melhores fontes de descrição
+    ordem = {"home": 0, "sobre": 1}
+    for pagina in sorted(paginas, key=lambda p: ordem.get(p.categoria, 2)):
+        mesclado["paginas"].append({"url": pagina.url, "categoria": pagina.categoria, "erro": pagina.erro})
+        extract = pagina.extract or {}
+        if not extract:
+            continue
+
+        if not mesclado["description"] and pagina.categoria in ("home", "sobre"):
+            mesclado["description"] = extract.get("description", "")
+        if not mesclado["target_audience"]:
+            mesclado["target_audience"] = extract.get("target_audience", "")
 
+        servicos = extract.get("services") or []
+        if not servicos and pagina.categoria == "servicos":
+            servicos = [_nome_da_pagina(extract.get("title", ""), empresa)]
+        adicionar("services", servicos)
+        adicionar("differentials", extract.get("differentials"))
 
-async def scrape_basico(url: str) -> dict:
+    return mesclado
+
+
+def _nome_da_pagina(titulo: str, empresa: str) -> str:
     """
-    Scrape básico sem Firecrawl (fallback).
+    "Radar de Crédito | Datarisk" -> "Radar de Crédito"
     """
-    async with httpx.AsyncClient() as client:
+    partes = [p.strip() for p in re.split(r"\s+[|\-–—:·]+\s+", titulo) if p.strip()]
+    partes = [p for p in partes if p.lower() != empresa.lower()]
+    return partes[0] if partes and len(partes[0]) <= 80 else ""
+
+
+async def scrape_site(url: str, firecrawl: bool = True) -> dict:
+    """
+    Extrai os dados do site: primeiro localmente (core/extrator.py); a
+    Firecrawl API só é chamada (com `firecrawl=True`) quando a confiança
+    da extração local fica abaixo de EXTRATOR_CONFIANCA_MIN.
+
+    O resultado fica em cache por URL. Dentro de SCRAPE_CACHE_TTL não há
+    nenhuma requisição; depois disso a página é revalidada com
+    ETag/Last-Modified e, se o conteúdo não mudou, a extração anterior é
+    reaproveitada. Se a revalidação falhar (rede, 5xx), a extração
+    anterior é servida vencida. Uma extração local de baixa confiança só
+    é reaproveitada sem Firecrawl: com ela, cada revalidação tenta a
+    Firecrawl de novo.
+    """
+    cache = _cache_scrape()
+    chave = normalizar_url(url)
+    entrada = cache.get(chave)
+
+    if entrada and time.time() - entrada["buscado_em"] < SCRAPE_CACHE_TTL:
+        return entrada["extract"]
+
+    erro_busca = None
+    try:
+        pagina = await buscar_pagina(url, entrada)
+    except Exception as e:
+        # Revalidação falhou: a cópia vencida ainda vale mais que nada
+        # (`buscado_em` não muda, a próxima chamada tenta de novo)
+        if entrada:
+            print(f"⚠️ Revalidação de {url} falhou, usando versão em cache: {e}")
+            return entrada["extract"]
+
+        # Sem a página, a Firecrawl ainda pode dar conta; sem ela, o erro
+        # sobe para o diagnóstico registrar (e não guardar) a falha
+        if not (firecrawl and FIRECRAWL_API_KEY):
+            raise
+        pagina, erro_busca = None, e
+
+    usar_firecrawl = firecrawl and FIRECRAWL_API_KEY
+    inalterada = bool(entrada and pagina and (pagina["nao_modificada"] or pagina["hash"] == entrada["hash"]))
+
+    if inalterada:
+        entrada["buscado_em"] = time.time()
+        entrada["etag"] = pagina["etag"] or entrada["etag"]
+        entrada["last_modified"] = pagina["last_modified"] or entrada["last_modified"]
+        if not (usar_firecrawl and _local_fraca(entrada)):
+            cache.set(chave, entrada)
+            return entrada["extract"]
+
+        # Página igual, mas a extração guardada é local e fraca (a
+        # Firecrawl falhou antes): só a Firecrawl é tentada de novo
+        extract, fonte = entrada["extract"], entrada["fonte"]
+    else:
+        extract = extrair_local(pagina["head"], pagina["conteudo"]) if pagina and pagina["head"] else {}
+        fonte = "local"
+
+    if usar_firecrawl and extract.get("confianca", 0) < EXTRATOR_CONFIANCA_MIN:
         try:
-            response = await client.get(url, timeout=10.0, follow_redirects=True)
-
-            if response.status_code == 200:
-                html = response.text
-
-                # Extrai título
-                import re
-                title_match = re.search(r'<title>(.*?)</title>', html, re.IGNORECASE)
-                title = title_match.group(1) if title_match else ""
-
-                # Extrai meta description
-                desc_match = re.search(
-                    r'<meta\s+name=["\']description["\']\s+content=["\'](.*?)["\']',
-                    html,
-                    re.IGNORECASE
-                )
-                description = desc_match.group(1) if desc_match else title
-
-                return {
-                    "description": description,
-                    "services": [],
-                    "differentials": [],
-                    "target_audience": ""
+            remoto = await scrape_firecrawl(url)
+        except Exception as e:
+            print(f"⚠️ Firecrawl falhou para {url}, usando extração local: {e}")
+            remoto = {}
+        if remoto:
+            extract, fonte = remoto, "firecrawl"
+
+    if erro_busca is not None and not extract:
+        raise erro_busca
+
+    if inalterada:
+        cache.set(chave, {**entrada, "extract": extract, "fonte": fonte})
+    elif extract:
+        cache.set(chave, {
+            "url": chave,
+            "extract": extract,
+            "fonte": fonte,
+            "hash": pagina["hash"] if pagina else None,
+            "etag": pagina["etag"] if pagina else None,
+            "last_modified": pagina["last_modified"] if pagina else None,
+            "buscado_em": time.time()
+        })
+
+    return extract
+
+
+def _local_fraca(entrada: dict) -> bool:
+    """Extração em cache veio do extrator local com confiança baixa."""
+    return entrada.get("fonte") == "local" and entrada["extract"].get("confianca", 0) < EXTRATOR_CONFIANCA_MIN
+
+
+async def scrape_firecrawl(url: str) -> dict:
+    """
+    Extrai dados estruturados do site com a Firecrawl API (pago).
+    """
+    client = get_http("firecrawl")
+
+    response = await client.post(
+        "https://api.firecrawl.dev/v1/scrape",
+        headers={
+            "Authorization": f"Bearer {FIRECRAWL_API_KEY}",
+            "Content-Type": "application/json"
+        },
+        json={
+            "url": url,
+            "formats": ["markdown", "extract"],
+            "extract": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "description": {"type": "string"},
+                        "services": {"type": "array", "items": {"type": "string"}},
+                        "differentials": {"type": "array", "items": {"type": "string"}},
+                        "target_audience": {"type": "string"}
+                    }
                 }
-        except Exception:
-            pass
+            }
+        },
+        timeout=30.0
+    )
+
+    if response.status_code == 200:
+        data = response.json()
+        return data.get("data", {}).get("extract", {})
 
     return {}
 
 
+async def buscar_pagina(url: str, anterior: Optional[dict] = None) -> dict:
+    """
+    Baixa a página em streaming, com requisição condicional quando há
+    versão em cache. O <head> e as seções do corpo são extraídos durante a
+    leitura, que para em SCRAPE_HTML_MAX bytes; o HTML bruto nunca fica
+    inteiro em memória.
+
+    Returns:
+        {"nao_modificada", "head", "conteudo", "hash", "etag",
+        "last_modified"}
+
+    Raises:
+        httpx.HTTPError: falha de rede ou status de erro (4xx/5xx)
+    """
+    client = get_http("sites")
+
+    headers = {}
+    if anterior:
+        if anterior.get("etag"):
+            headers["If-None-Match"] = anterior["etag"]
+        if anterior.get("last_modified"):
+            headers["If-Modified-Since"] = anterior["last_modified"]
+
+    async with client.stream("GET", url, headers=headers, timeout=10.0, follow_redirects=True) as response:
+        pagina = {
+            "nao_modificada": response.status_code == 304,
+            "head": None,
+            "conteudo": None,
+            "hash": None,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified")
+        }
+
+        if response.status_code == 304:
+            return pagina
+        if response.status_code >= 400:
+            raise httpx.HTTPStatusError(
+                f"HTTP {response.status_code} em {url}", request=response.request, response=response
+            )
+
+        content_type = response.headers.get("content-type")
+        leitor = LeitorHead(content_type, limite_bytes=HTML_HEAD_MAX)
+        corpo = LeitorConteudo(content_type, limite_bytes=SCRAPE_HTML_MAX)
+        digest = hashlib.sha256()
+
+        async for pedaco in response.aiter_bytes():
+            digest.update(pedaco[:SCRAPE_HTML_MAX - corpo.bytes_lidos])
+            leitor.alimentar(pedaco)
+            if corpo.alimentar(pedaco):
+                break
+
+    pagina["head"] = leitor.finalizar()
+    pagina["conteudo"] = corpo.finalizar()
+    pagina["hash"] = digest.hexdigest()
+    return pagina
+
+
+def _cache_scrape():
+    # Guarda por mais tempo que o TTL de frescor: entradas velhas ainda
+    # servem para a revalidação condicional
+    return get_cache("scrape", ttl=SCRAPE_CACHE_RETENCAO, max_itens=256)
+
+
 async def search_web(query: str) -> dict:
     """
-    Busca informações na web usando Serper API.
+    Busca informações na web usando Serper API (com cache, ver
+    core/serper.py).
+
+    Returns:
+        {"summary", "competitors", "organic"}: resumo dos 3 primeiros
+        snippets, 5 primeiros títulos e os resultados orgânicos completos
+
+    Raises:
+        httpx.HTTPError: a busca falhou (ex: chave inválida, cota esgotada)
     """
-    if not SERPER_API_KEY:
+    data = await buscar(query)
+    if not data:
         return {}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://google.serper.dev/search",
-            headers={
-                "X-API-KEY": SERPER_API_KEY,
-                "Content-Type": "application/json"
-            },
-            json={
-                "q": query,
-                "gl": "br",
-                "hl": "pt-br",
-                "num": 10
-            },
-            timeout=10.0
-        )
-
-        if response.status_code == 200:
-            data = response.json()
-
-            # Extrai informações relevantes
-            organic = data.get("organic", [])
-
-            return {
-                "summary": " ".join([r.get("snippet", "") for r in organic[:3]]),
-                "competitors": [r.get("title", "") for r in organic[:5]]
-            }
+    organic = data.get("organic", [])
 
-    return {}
+    return {
+        "summary": " ".join([r.get("snippet", "") for r in organic[:3]]),
+        "competitors": [r.get("title", "") for r in organic[:5]],
+        "organic": organic
+    }
+
+
+def _normalizar_termo(texto: str) -> str:
+    return " ".join(texto.lower().split())
@@ -3,12 +3,45 @@
 """
 
 import os
+import re
 import json
-from agents import function_tool
-from openai import AsyncOpenAI
-
-
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+from functools import partial
+from typing import Optional
+from agents import function_tool, RunContextWrapper
+from chatkit.agents import AgentContext
+
+from core.clients import get_openai
+from core.fanout import FanOut, Tarefa, ResultadoTarefa
+from core.cache import get_cache, chave_cache
+from core.singleflight import get_singleflight
+from core.urls import normalizar_url
+from core.biblioteca import get_biblioteca, quantos_da_biblioteca, CATEGORIAS_BIBLIOTECA
+from widgets.ao_vivo import CardAoVivo
+from widgets.prompts_list import prompts_list_widget
+
+
+# Conjuntos de prompts gerados: 30 dias no cache persistente
+PROMPTS_CACHE_TTL = float(os.getenv("PROMPTS_CACHE_TTL", str(30 * 86400)))
+PROMPTS_CACHE_MAX_ITENS = int(os.getenv("PROMPTS_CACHE_MAX_ITENS", "256"))
+
+# Uma chamada por categoria, em paralelo (0 = uma chamada só para os 20)
+PROMPTS_POR_CATEGORIA = os.getenv("PROMPTS_POR_CATEGORIA", "1") not in ("0", "false", "False")
+
+# (categoria, quantidade, primeira ordem): as faixas de `ordem` são fixas
+CATEGORIAS = [
+    ("BRANDED", 5, 1),
+    ("UNBRANDED", 5, 6),
+    ("PROBLEM", 4, 11),
+    ("COMPARISON", 3, 15),
+    ("PURCHASE", 2, 18),
+    ("RESEARCH", 1, 20)
+]
+
+# Campos de `dados` que entram no contexto (e na chave do cache)
+CAMPOS_CONTEXTO = (
+    "site", "nicho", "descricao", "servicos", "diferenciais",
+    "publico_alvo", "contexto_mercado", "concorrentes"
+)
 
 
 PROMPT_GENERATOR_SYSTEM = """
@@ -83,23 +116,220 @@ Sua tarefa é gerar 20 prompts otimizados que um usuário real digitaria em Chat
 
 @function_tool
 async def gerar_prompts(
+    ctx: RunContextWrapper[AgentContext],
     empresa: str,
-    dados: dict
+    dados: dict,
+    regenerar: bool = False
 ) -> list:
     """
     Gera 20 prompts GEO otimizados para a empresa.
 
+    Conjuntos gerados ficam em cache pela impressão digital do diagnóstico
+    (empresa + campos usados no contexto): reanálises de uma empresa que
+    não mudou reaproveitam os mesmos prompts na hora.
+
+    Com PROMPTS_POR_CATEGORIA (padrão), cada categoria é gerada numa
+    chamada própria, em paralelo, e a lista aparece ao vivo no chat à
+    medida que as categorias chegam. A lista final sempre é mostrada,
+    mesmo vinda do cache. Categorias sem marca (UNBRANDED, PROBLEM,
+    RESEARCH) reaproveitam prompts já provados no mesmo nicho.
+
     Args:
         empresa: Nome da empresa
         dados: Dados do diagnóstico (descrição, serviços, nicho, etc)
+        regenerar: Ignora o cache e gera um conjunto novo
 
     Returns:
         Lista de 20 prompts categorizados
     """
-    client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    chave = impressao_digital(empresa, dados)
+    voos = get_singleflight("prompts")
+    card = CardAoVivo(ctx.context)
+
+    try:
+        prompts = None if regenerar else _cache_prompts().get(chave)
+        if regenerar:
+            voos.esquecer(chave)
+
+        if prompts is None:
+            # Mesma empresa e mesmos dados ao mesmo tempo: uma só geração
+            gerado = await voos.executar(
+                chave,
+                lambda: _gerar_e_guardar(card, empresa, dados, chave),
+                guardar=lambda g: g["completo"]
+            )
+            prompts = gerado["prompts"]
+
+        card.atualizar(prompts_list_widget(prompts))
+    finally:
+        await card.encerrar()
+
+    return prompts
+
+
+def impressao_digital(empresa: str, dados: dict) -> str:
+    """
+    Hash estável de `empresa` e dos campos de `dados` que montam o
+    contexto do LLM, normalizados (caixa, espaços, ordem das listas).
+    Campos como `tempos_ms` ou `erros` não mudam a chave.
+    """
+    def normalizar(valor) -> str:
+        if isinstance(valor, (list, tuple)):
+            return "|".join(sorted(normalizar(v) for v in valor))
+        return " ".join(str(valor or "").lower().split())
+
+    campos = {campo: normalizar(dados.get(campo)) for campo in CAMPOS_CONTEXTO}
+    if campos["site"]:
+        campos["site"] = normalizar_url(campos["site"])
+
+    return chave_cache(normalizar(empresa), *campos.values())
+
+
+async def _gerar_e_guardar(card: CardAoVivo, empresa: str, dados: dict, chave: str) -> dict:
+    """
+    Gera o conjunto e guarda no cache se veio todo do LLM. Conjuntos com
+    prompts genéricos de fallback são retornados, mas não guardados.
+
+    Returns:
+        {"prompts": [...], "completo": bool}
+    """
+    if PROMPTS_POR_CATEGORIA:
+        prompts, completo = await _gerar_por_categoria(card, empresa, dados)
+    else:
+        prompts = await _gerar_prompts(empresa, dados)
+        completo = bool(prompts)
+        # Fallback: retorna prompts genéricos
+        prompts = prompts or gerar_prompts_fallback(empresa, dados)
+
+    if completo:
+        _cache_prompts().set(chave, prompts)
+    return {"prompts": prompts, "completo": completo}
+
+
+async def _gerar_por_categoria(card: CardAoVivo, empresa: str, dados: dict) -> tuple:
+    """
+    Uma chamada por categoria, em paralelo. Cada categoria tem sua faixa
+    fixa de `ordem` (BRANDED 1-5, UNBRANDED 6-10, ...), então a numeração
+    não depende de qual chamada termina primeiro. Categoria que falha (ou
+    vem incompleta) é completada com os prompts de fallback dela.
+
+    Com `nicho` no diagnóstico, as categorias sem marca usam prompts
+    provados da biblioteca do nicho em parte das vagas; o resto continua
+    sendo gerado, para a biblioteca se renovar.
+
+    Returns:
+        (prompts ordenados, True se nenhuma categoria usou fallback)
+    """
+    contexto = _montar_contexto(empresa, dados)
+    fallback = {p["ordem"]: p for p in gerar_prompts_fallback(empresa, dados)}
+    prontos: dict = {}
+    gerados_llm: list = []
+    completo = True
+
+    nicho = dados.get("nicho")
+    biblioteca = get_biblioteca() if nicho else None
+    a_gerar = []
+    for categoria, quantidade, inicio in CATEGORIAS:
+        sugeridos = []
+        if biblioteca and categoria in CATEGORIAS_BIBLIOTECA:
+            reaproveitar = quantos_da_biblioteca(quantidade)
+            if reaproveitar:
+                sugeridos = biblioteca.sugerir(nicho, categoria, reaproveitar)
+        # Biblioteca nas primeiras vagas da categoria, geração no resto
+        for i, prompt in enumerate(sugeridos):
+            prontos[inicio + i] = {"ordem": inicio + i, **prompt}
+        if len(sugeridos) < quantidade:
+            a_gerar.append((categoria, quantidade - len(sugeridos), inicio + len(sugeridos)))
+    da_biblioteca = {prontos[o]["texto"] for o in prontos}
+
+    # Lista ao vivo: cada categoria aparece assim que chega
+    card.atualizar(prompts_list_widget(_ordenados(prontos), gerando=True))
+
+    def ao_concluir(indice: int, resultado: ResultadoTarefa) -> None:
+        nonlocal completo
+        categoria, quantidade, inicio = a_gerar[indice]
+        gerados = resultado.valor or []
+        if resultado.erro is not None:
+            print(f"⚠️ Erro ao gerar prompts {categoria}, usando fallback: {resultado.erro}")
+
+        for i in range(quantidade):
+            ordem = inicio + i
+            if i < len(gerados):
+                prontos[ordem] = {**gerados[i], "ordem": ordem, "categoria": categoria}
+                gerados_llm.append(ordem)
+            else:
+                completo = False
+                prontos[ordem] = fallback[ordem]
+
+        card.atualizar(prompts_list_widget(_ordenados(prontos), gerando=True))
+
+    tarefas = [
+        Tarefa(chave="openai", executar=partial(_gerar_categoria, contexto, categoria, quantidade))
+        for categoria, quantidade, _ in a_gerar
+    ]
+
+    if tarefas:
+        await FanOut(limite_global=len(tarefas), limite_por_chave=len(tarefas)).executar(tarefas, ao_concluir)
+
+    # Prompts novos entram na biblioteca; quase-duplicatas voltam com o
+    # texto já conhecido, que tem respostas em cache
+    if biblioteca and gerados_llm:
+        ordens = sorted(gerados_llm)
+        originais = [prontos[o] for o in ordens]
+        canonicos = biblioteca.registrar(nicho, originais, empresa=empresa)
+        for ordem, original, canonico in zip(ordens, originais, canonicos):
+            # Canônico igual a um prompt que já veio da biblioteca repetiria
+            # o prompt no conjunto: fica o texto gerado
+            prontos[ordem] = original if canonico["texto"] in da_biblioteca else canonico
+
+    return _ordenados(prontos), completo
+
+
+async def _gerar_categoria(contexto: str, categoria: str, quantidade: int) -> Optional[list]:
+    """
+    Gera os prompts de uma categoria. Retorna None se a resposta não for
+    JSON válido.
+    """
+    response = await get_openai().chat.completions.create(
+        model="gpt-4.1",
+        messages=[
+            {"role": "system", "content": _sistema_categoria(categoria, quantidade)},
+            {"role": "user", "content": f"Gere {quantidade} prompts GEO {categoria} para:\n\n{contexto}"}
+        ],
+        response_format={"type": "json_object"},
+        temperature=0.7
+    )
+
+    try:
+        result = json.loads(response.choices[0].message.content)
+    except json.JSONDecodeError:
+        return None
+
+    prompts = _validar(result.get("prompts", []))
+    return [p for p in prompts if p["texto"]][:quantidade]
+
 
-    # Monta contexto da empresa
-    contexto = f"""
+def _sistema_categoria(categoria: str, quantidade: int) -> str:
+    """
+    System prompt de uma categoria: as mesmas regras de
+    PROMPT_GENERATOR_SYSTEM, só com a seção da categoria pedida.
+    """
+    regras = PROMPT_GENERATOR_SYSTEM.split("## Categorias")[0].replace(
+        "gerar 20 prompts otimizados",
+        f"gerar {quantidade} prompts otimizados da categoria {categoria}"
+    )
+    secao = re.search(rf"### {categoria} \(.*?(?=\n### |\n## )", PROMPT_GENERATOR_SYSTEM, re.DOTALL).group(0)
+    formato = PROMPT_GENERATOR_SYSTEM[PROMPT_GENERATOR_SYSTEM.index("## Formato de Saída"):]
+
+    return f"{regras}## Categoria (exatamente {quantidade} prompts):\n\n{secao.strip()}\n\n{formato}"
+
+
+def _ordenados(prontos: dict) -> list:
+    return [prontos[ordem] for ordem in sorted(prontos)]
+
+
+def _montar_contexto(empresa: str, dados: dict) -> str:
+    return f"""
     EMPRESA: {empresa}
     SITE: {dados.get('site', '')}
     NICHO: {dados.get('nicho', 'não especificado')}
@@ -111,6 +341,38 @@ async def gerar_prompts(
     CONCORRENTES: {', '.join(dados.get('concorrentes', []))}
     """
 
+
+def _validar(prompts: list) -> list:
+    """
+    Valida a estrutura dos prompts vindos do LLM, com valores padrão.
+    """
+    prompts_validados = []
+    for p in prompts:
+        if not isinstance(p, dict):
+            continue
+        prompts_validados.append({
+            "ordem": p.get("ordem", len(prompts_validados) + 1),
+            "texto": p.get("texto", ""),
+            "categoria": p.get("categoria", "UNBRANDED"),
+            "intent": p.get("intent", "informacional"),
+            "persona": p.get("persona", ""),
+            "formato_esperado": p.get("formato_esperado", "explicacao")
+        })
+    return prompts_validados
+
+
+def _cache_prompts():
+    return get_cache("prompts", ttl=PROMPTS_CACHE_TTL, max_itens=PROMPTS_CACHE_MAX_ITENS)
+
+
+async def _gerar_prompts(empresa: str, dados: dict) -> Optional[list]:
+    """
+    Uma chamada ao LLM. Retorna None se a resposta não for JSON válido.
+    """
+    client = get_openai()
+
+    contexto = _montar_contexto(empresa, dados)
+
     response = await client.chat.completions.create(
         model="gpt-4.1",
         messages=[
@@ -123,25 +385,10 @@ async def gerar_prompts(
 
     try:
         result = json.loads(response.choices[0].message.content)
-        prompts = result.get("prompts", [])
-
-        # Valida estrutura
-        prompts_validados = []
-        for p in prompts:
-            prompts_validados.append({
-                "ordem": p.get("ordem", len(prompts_validados) + 1),
-                "texto": p.get("texto", ""),
-                "categoria": p.get("categoria", "UNBRANDED"),
-                "intent": p.get("intent", "informacional"),
-                "persona": p.get("persona", ""),
-                "formato_esperado": p.get("formato_esperado", "explicacao")
-            })
-
-        return prompts_validados
+        return _validar(result.get("prompts", []))
 
     except json.JSONDecodeError:
-        # Fallback: retorna prompts genéricos
-        return gerar_prompts_fallback(empresa, dados)
+        return None
 
 
 def gerar_prompts_fallback(empresa: str, dados: dict) -> list:
@@ -3,21 +3,57 @@
 """
 
 import os
-import asyncio
-from agents import function_tool
-from openai import AsyncOpenAI
-import google.generativeai as genai
+from bisect import bisect_right
+from contextlib import aclosing
+from datetime import datetime, timedelta
+from functools import partial
+from math import sqrt
+from typing import Optional
+from agents import function_tool, RunContextWrapper
+from chatkit.agents import AgentContext
+
+from core.fanout import FanOut, Tarefa, ResultadoTarefa
+from core.clients import get_openai, get_gemini
+from core.cache import get_cache, chave_cache
+from core.mencoes import MentionMatcher, Varredura, criar_matcher
+from core.rate_limit import get_limitador, com_retentativas
+from widgets.resultado import progresso_visibilidade_widget, score_visibilidade_widget
+from widgets.ao_vivo import CardAoVivo
 
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
+# Limites do fan-out prompt × LLM
+LLM_CONCORRENCIA_GLOBAL = int(os.getenv("LLM_CONCORRENCIA_GLOBAL", "16"))
+LLM_CONCORRENCIA_POR_PROVEDOR = int(os.getenv("LLM_CONCORRENCIA_POR_PROVEDOR", "4"))
+
+# Cache de respostas (mesmo prompt + modelo + parâmetros = mesma chave)
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MAX_ITENS = int(os.getenv("LLM_CACHE_MAX_ITENS", "2048"))
+
+CHATGPT_MODELO = "gpt-4o-mini"  # Usa modelo mais barato para testes
+CHATGPT_PARAMS = {"max_tokens": 500, "temperature": 0.7}
+GEMINI_MODELO = "gemini-pro"
+GEMINI_PARAMS = {}
+
 
 @function_tool
 async def testar_visibilidade_llm(
+    ctx: RunContextWrapper[AgentContext],
     empresa: str,
     prompts: list,
-    llms: list = None
+    llms: list = None,
+    forcar_atualizacao: bool = False,
+    aliases: list = None,
+    concorrentes: list = None,
+    apenas_mencao: bool = False,
+    limite_tokens: int = 500,
+    amostragem: bool = False,
+    max_amostras: int = 5,
+    min_amostras: int = 2,
+    margem_alvo: float = 10.0,
+    analise_id: str = None,
+    janela_frescor_horas: float = 168
 ) -> dict:
     """
     Testa se a empresa é mencionada nas respostas das LLMs.
@@ -26,6 +62,20 @@ async def testar_visibilidade_llm(
         empresa: Nome da empresa para buscar nas respostas
         prompts: Lista de prompts para testar (usa os 5 primeiros)
         llms: Lista de LLMs para testar (default: ["chatgpt", "gemini"])
+        forcar_atualizacao: Ignora respostas em cache e consulta as LLMs de novo
+        aliases: Outras grafias da marca (ex: ["Data Risk"])
+        concorrentes: Concorrentes para contar nas mesmas respostas
+        apenas_mencao: Lê a resposta em streaming e para assim que a marca
+            aparece (mais rápido e barato; concorrentes ficam parciais)
+        limite_tokens: Máximo de tokens lidos por resposta no modo apenas_mencao
+        amostragem: Repete cada prompt até o score estabilizar e retorna
+            intervalos de confiança (95%)
+        max_amostras: Máximo de rodadas por prompt na amostragem
+        min_amostras: Mínimo de rodadas antes de avaliar a parada
+        margem_alvo: Meia-largura do intervalo (pontos %) que encerra a amostragem
+        analise_id: Análise monitorada; reaproveita o último teste salvo e só
+            refaz pares velhos, com prompt alterado ou que deram erro
+        janela_frescor_horas: Idade máxima de um resultado reaproveitado
 
     Returns:
         Resultados do teste com score de visibilidade
@@ -45,62 +95,175 @@ async def testar_visibilidade_llm(
         "detalhes": []
     }
 
+    # Dispara todos os pares (LLM, prompt) de uma vez; a ordem das tarefas
+    # define a ordem dos resultados, que é a mesma dos loops originais.
+    prompts_texto = [
+        prompt.get("texto", prompt) if isinstance(prompt, dict) else prompt
+        for prompt in prompts_teste
+    ]
+
+    # Marca, aliases e concorrentes num único autômato, montado uma vez
+    matcher = criar_matcher(empresa, aliases, concorrentes)
+
+    pares = [(llm, prompt_texto) for llm in llms for prompt_texto in prompts_texto]
+    # amostras[i] guarda as saídas do par i, uma por rodada
+    amostras = [[] for _ in pares]
+
+    # Monitoramento incremental: pares ainda frescos do último teste
+    store = getattr(ctx.context, "store", None)
+    reaproveitados = {}
+    if analise_id and store is not None and not forcar_atualizacao:
+        try:
+            anterior = await store.get_ultimo_teste_visibilidade(analise_id)
+        except Exception as e:
+            # Sem o teste anterior, retesta tudo
+            print(f"⚠️ Erro ao buscar último teste de visibilidade, retestando todos os pares: {e}")
+            anterior = None
+        reaproveitados = pares_reaproveitaveis(
+            anterior, pares, timedelta(hours=janela_frescor_horas), matcher.assinatura
+        )
+
+    fan_out = FanOut(
+        limite_global=LLM_CONCORRENCIA_GLOBAL,
+        limite_por_chave=LLM_CONCORRENCIA_POR_PROVEDOR
+    )
+
+    # Card ao vivo: atualiza a cada par (prompt, LLM) concluído
+    progresso = ProgressoVisibilidade(empresa, llms, len(prompts_texto))
+    card = CardAoVivo(ctx.context)
+
+    for i, detalhe in reaproveitados.items():
+        progresso.registrar(pares[i][0], ResultadoTarefa(chave=pares[i][0], valor=detalhe))
+    if reaproveitados:
+        card.atualizar(progresso_visibilidade_widget(progresso.estado()))
+
+    rodadas = max(1, max_amostras) if amostragem else 1
+    parada = None
+
+    try:
+        for rodada in range(rodadas):
+            if rodada > 0:
+                progresso.nova_rodada()
+
+            # Na primeira rodada, pares reaproveitados não são consultados
+            indices = [i for i in range(len(pares)) if rodada > 0 or i not in reaproveitados]
+
+            def ao_concluir(indice: int, saida, indices=indices) -> None:
+                progresso.registrar(pares[indices[indice]][0], saida)
+                card.atualizar(progresso_visibilidade_widget(progresso.estado()))
+
+            tarefas = [
+                Tarefa(chave=pares[i][0], executar=partial(
+                    _testar_par, matcher, empresa, pares[i][0], pares[i][1], not forcar_atualizacao,
+                    limite_tokens if apenas_mencao else None, rodada
+                ))
+                for i in indices
+            ]
+
+            saidas = dict(zip(indices, await fan_out.executar(tarefas, ao_concluir=ao_concluir)))
+            for i, lista in enumerate(amostras):
+                if i in saidas:
+                    lista.append(saidas[i])
+                else:
+                    lista.append(ResultadoTarefa(chave=pares[i][0], valor=reaproveitados[i]))
+
+            if amostragem and rodada + 1 >= min_amostras:
+                mencoes, medidos = _contar_amostras(amostras)
+                parada = criterio_parada(mencoes, medidos, margem_alvo)
+                if parada:
+                    break
+    except BaseException:
+        await card.encerrar()
+        raise
+
     total_mencoes = 0
     total_testes = 0
+    total_medidos = 0
+    mencoes_concorrentes = {c: 0 for c in matcher.entidades if c != empresa}
+    amostras_por_par = iter(amostras)
 
     for llm in llms:
         llm_resultados = []
         mencoes_llm = 0
-
-        for prompt in prompts_teste:
-            prompt_texto = prompt.get("texto", prompt) if isinstance(prompt, dict) else prompt
-
-            try:
-                if llm == "chatgpt":
-                    resposta = await testar_chatgpt(prompt_texto)
-                elif llm == "gemini":
-                    resposta = await testar_gemini(prompt_texto)
-                else:
-                    resposta = "LLM não suportada"
-
-                # Verifica se a empresa foi mencionada
-                mencionado = empresa.lower() in resposta.lower()
-
-                if mencionado:
-                    mencoes_llm += 1
-                    total_mencoes += 1
-
-                llm_resultados.append({
-                    "prompt": prompt_texto[:100] + "..." if len(prompt_texto) > 100 else prompt_texto,
-                    "mencionado": mencionado,
-                    "resposta_preview": resposta[:200] + "..." if len(resposta) > 200 else resposta
-                })
-
-                total_testes += 1
-
-            except Exception as e:
+        medidos_llm = 0
+        testes_llm = 0
+
+        for prompt_texto in prompts_texto:
+            lista = next(amostras_por_par)
+            medidas = [saida.valor for saida in lista if saida.ok]
+            mencoes_par = sum(1 for valor in medidas if valor["mencionado"])
+
+            testes_llm += len(lista)
+            medidos_llm += len(medidas)
+            mencoes_llm += mencoes_par
+
+            for valor in medidas:
+                for concorrente in valor.get("concorrentes_mencionados", []):
+                    if concorrente in mencoes_concorrentes:
+                        mencoes_concorrentes[concorrente] += 1
+
+            if medidas:
+                detalhe = dict(medidas[0])
+                if len(lista) > 1:
+                    detalhe["amostras"] = len(medidas)
+                    detalhe["mencoes_amostras"] = mencoes_par
+                    detalhe["taxa_mencao"] = round(mencoes_par / len(medidas), 3)
+                    # Maioria estrita: empate (ex: 1 de 2) não conta como menção
+                    detalhe["mencionado"] = mencoes_par * 2 > len(medidas)
+                llm_resultados.append(detalhe)
+            else:
+                # Falha não é "não mencionado": fica fora do score
                 llm_resultados.append({
                     "prompt": prompt_texto[:100],
-                    "mencionado": False,
-                    "erro": str(e)
+                    "mencionado": None,
+                    "medido": False,
+                    "erro": str(lista[-1].erro)
                 })
-                total_testes += 1
 
-        # Calcula score da LLM
-        score_llm = (mencoes_llm / len(prompts_teste)) * 100 if prompts_teste else 0
+        total_testes += testes_llm
+        total_medidos += medidos_llm
+        total_mencoes += mencoes_llm
+
+        # Calcula score da LLM (só sobre os testes que foram medidos)
+        score_llm = (mencoes_llm / medidos_llm) * 100 if medidos_llm else 0
 
         resultados["resultados_por_llm"][llm] = {
+            # mencoes, total, medidos e nao_medidos contam amostras (um
+            # teste por par sem amostragem)
             "mencoes": mencoes_llm,
-            "total": len(prompts_teste),
+            "total": testes_llm,
+            "prompts": len(prompts_teste),
+            "medidos": medidos_llm,
+            "nao_medidos": testes_llm - medidos_llm,
             "score": round(score_llm, 1),
             "detalhes": llm_resultados
         }
 
+        if amostragem:
+            resultados["resultados_por_llm"][llm]["intervalo_confianca"] = intervalo_wilson(mencoes_llm, medidos_llm)
+
+    if mencoes_concorrentes:
+        resultados["mencoes_concorrentes"] = mencoes_concorrentes
+
+    if amostragem:
+        inferior, superior = intervalo_wilson(total_mencoes, total_medidos)
+        resultados["amostragem"] = {
+            "amostras_por_prompt": len(amostras[0]) if amostras else 0,
+            "intervalo_confianca": {"inferior": inferior, "superior": superior, "nivel": 0.95},
+            "parada": parada or "limite_amostras"
+        }
+
     # Score geral
-    resultados["score_geral"] = round((total_mencoes / total_testes) * 100, 1) if total_testes > 0 else 0
+    resultados["score_geral"] = round((total_mencoes / total_medidos) * 100, 1) if total_medidos > 0 else 0
+    resultados["total_medidos"] = total_medidos
+    resultados["total_nao_medidos"] = total_testes - total_medidos
 
     # Classificação
-    if resultados["score_geral"] >= 80:
+    if total_testes > 0 and total_medidos == 0:
+        resultados["classificacao"] = "indisponivel"
+        resultados["emoji"] = "⚪"
+        resultados["mensagem"] = "Não conseguimos consultar as IAs agora. Tente novamente em alguns minutos."
+    elif resultados["score_geral"] >= 80:
         resultados["classificacao"] = "excelente"
         resultados["emoji"] = "🟢"
         resultados["mensagem"] = "Parabéns! Sua empresa tem ótima visibilidade nas IAs."
@@ -117,43 +280,435 @@ async def testar_visibilidade_llm(
         resultados["emoji"] = "🔴"
         resultados["mensagem"] = "As IAs não conhecem sua empresa. Precisamos mudar isso!"
 
+    if analise_id:
+        resultados["analise_id"] = analise_id
+        resultados["delta"] = {
+            "reaproveitados": len(reaproveitados),
+            "retestados": len(pares) - len(reaproveitados),
+            "janela_frescor_horas": janela_frescor_horas
+        }
+
+        # Salva o resultado mesclado: é a base do próximo teste incremental
+        if store is not None:
+            try:
+                await store.save_teste_visibilidade(analise_id, resultados)
+            except Exception as e:
+                print(f"⚠️ Erro ao salvar teste de visibilidade: {e}")
+
+    # O card ao vivo termina como o card final de score
+    card.atualizar(score_visibilidade_widget(resultados))
+    await card.encerrar()
+
     return resultados
 
 
-async def testar_chatgpt(prompt: str) -> str:
+# Limiares de classificação do score (regular / bom / excelente)
+LIMIARES_CLASSIFICACAO = (20, 50, 80)
+
+
+def _contar_amostras(amostras: list) -> tuple:
+    mencoes = medidos = 0
+    for lista in amostras:
+        for saida in lista:
+            if saida.ok:
+                medidos += 1
+                mencoes += 1 if saida.valor["mencionado"] else 0
+    return mencoes, medidos
+
+
+def intervalo_wilson(mencoes: int, medidos: int, z: float = 1.96) -> list:
     """
-    Testa um prompt no ChatGPT.
+    Intervalo de Wilson (em %) para a taxa de menção.
+    """
+    if not medidos:
+        return [0.0, 100.0]
+
+    p = mencoes / medidos
+    denominador = 1 + z ** 2 / medidos
+    centro = (p + z ** 2 / (2 * medidos)) / denominador
+    margem = z * sqrt(p * (1 - p) / medidos + z ** 2 / (4 * medidos ** 2)) / denominador
+
+    return [round(max(0.0, centro - margem) * 100, 1), round(min(1.0, centro + margem) * 100, 1)]
+
+
+def criterio_parada(mencoes: int, medidos: int, margem_alvo: float) -> Optional[str]:
+    """
+    Decide se a amostragem pode parar: "margem" quando o intervalo já está
+    estreito, "classificacao" quando ele cabe inteiro numa faixa de
+    classificação (20/50/80). None quando precisa de mais amostras.
+    """
+    if not medidos:
+        return None
+
+    inferior, superior = intervalo_wilson(mencoes, medidos)
+
+    if (superior - inferior) / 2 <= margem_alvo:
+        return "margem"
+
+    def faixa(score: float) -> int:
+        return sum(1 for limiar in LIMIARES_CLASSIFICACAO if score >= limiar)
+
+    if faixa(inferior) == faixa(superior):
+        return "classificacao"
+
+    return None
+
+
+def hash_prompt(prompt_texto: str) -> str:
+    return chave_cache(prompt_texto)[:16]
+
+
+def pares_reaproveitaveis(anterior: Optional[dict], pares: list, janela: timedelta, entidades_hash: str) -> dict:
+    """
+    Seleciona os pares do teste anterior que não precisam ser refeitos.
+
+    Um par é reaproveitado quando foi medido sem erro, o texto do prompt
+    é o mesmo (pelo hash), a marca, aliases e concorrentes são os mesmos
+    (`entidades_hash`, a assinatura do matcher) e o resultado é mais
+    novo que a janela.
+
+    Returns:
+        {índice do par: detalhe anterior}
+    """
+    if not anterior:
+        return {}
+
+    limite = datetime.utcnow() - janela
+    frescos = {}
+
+    for llm, dados in anterior.get("resultados", {}).get("resultados_por_llm", {}).items():
+        for detalhe in dados.get("detalhes", []):
+            testado_em = detalhe.get("testado_em")
+            if not detalhe.get("medido") or not testado_em or "prompt_hash" not in detalhe:
+                continue
+            if detalhe.get("entidades_hash") != entidades_hash:
+                continue
+            if datetime.fromisoformat(testado_em) < limite:
+                continue
+            frescos[(llm, detalhe["prompt_hash"])] = detalhe
+
+    reaproveitados = {}
+    for i, (llm, prompt_texto) in enumerate(pares):
+        detalhe = frescos.get((llm, hash_prompt(prompt_texto)))
+        if detalhe is not None:
+            reaproveitados[i] = detalhe
+
+    return reaproveitados
+
+
+class ProgressoVisibilidade:
+    """
+    Contagem parcial por LLM enquanto os testes chegam.
+    """
+
+    def __init__(self, empresa: str, llms: list, prompts_por_llm: int):
+        self.empresa = empresa
+        self.total = len(llms) * prompts_por_llm
+        self.concluidos = 0
+        self.por_llm = {
+            llm: {
+                "mencoes": 0,
+                "medidos": 0,
+                "nao_medidos": 0,
+                "total": prompts_por_llm,
+                "total_rodada": prompts_por_llm
+            }
+            for llm in llms
+        }
+
+    def nova_rodada(self) -> None:
+        """Mais uma amostra de cada par (modo amostragem)."""
+        for dados in self.por_llm.values():
+            self.total += dados["total_rodada"]
+            dados["total"] += dados["total_rodada"]
+
+    def registrar(self, llm: str, saida) -> None:
+        self.concluidos += 1
+        dados = self.por_llm[llm]
+
+        if saida.ok:
+            dados["medidos"] += 1
+            if saida.valor["mencionado"]:
+                dados["mencoes"] += 1
+        else:
+            dados["nao_medidos"] += 1
+
+    def estado(self) -> dict:
+        mencoes = sum(d["mencoes"] for d in self.por_llm.values())
+        medidos = sum(d["medidos"] for d in self.por_llm.values())
+
+        return {
+            "empresa": self.empresa,
+            "concluidos": self.concluidos,
+            "total": self.total,
+            "score_parcial": round(mencoes / medidos * 100, 1) if medidos else 0,
+            "por_llm": {llm: dict(d) for llm, d in self.por_llm.items()}
+        }
+
+
+async def _testar_par(
+    matcher: MentionMatcher,
+    empresa: str,
+    llm: str,
+    prompt_texto: str,
+    usar_cache: bool = True,
+    limite_tokens: Optional[int] = None,
+    amostra: int = 0
+) -> dict:
     """
-    client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    Testa um prompt em uma LLM e verifica se a empresa foi mencionada.
+
+    Com `limite_tokens`, a resposta é lida em streaming e cortada na
+    primeira menção à marca (ou ao atingir o limite). `amostra` separa as
+    repetições do mesmo prompt no cache (modo amostragem).
+    """
+    leitura = None
+    resposta = None
+
+    # O modo streaming aproveita respostas completas que já estão em cache
+    if limite_tokens is not None and llm in STREAMING and usar_cache:
+        resposta = _cache_respostas().get(_chave_resposta(llm, prompt_texto, amostra))
+
+    if resposta is None and limite_tokens is not None and llm in STREAMING:
+        leitura = await STREAMING[llm](prompt_texto, matcher, empresa, limite_tokens)
+        resposta = leitura.texto
+    elif resposta is None:
+        if llm == "chatgpt":
+            resposta = await testar_chatgpt(prompt_texto, usar_cache, amostra)
+        elif llm == "gemini":
+            resposta = await testar_gemini(prompt_texto, usar_cache, amostra)
+        else:
+            # Erro, não resposta: o par fica em "não medidos"
+            raise ValueError(f"LLM não suportada: {llm}")
+
+    # Verifica se a empresa (ou concorrentes) foram mencionados
+    posicoes = leitura.posicoes() if leitura else matcher.buscar(resposta)
+    mencionado = bool(posicoes.pop(empresa))
+
+    detalhe = {
+        "prompt": prompt_texto[:100] + "..." if len(prompt_texto) > 100 else prompt_texto,
+        "mencionado": mencionado,
+        "medido": True,
+        "resposta_preview": resposta[:200] + "..." if len(resposta) > 200 else resposta,
+        "prompt_hash": hash_prompt(prompt_texto),
+        "entidades_hash": matcher.assinatura,
+        "testado_em": datetime.utcnow().isoformat()
+    }
+
+    if leitura:
+        detalhe["tokens_lidos"] = leitura.tokens
+        detalhe["token_primeira_mencao"] = leitura.token_mencao
+        detalhe["interrompido"] = leitura.interrompido
+
+    concorrentes = [nome for nome, spans in posicoes.items() if spans]
+    if concorrentes:
+        detalhe["concorrentes_mencionados"] = concorrentes
+
+    return detalhe
+
+
+def _cache_respostas():
+    return get_cache("respostas_llm", ttl=LLM_CACHE_TTL, max_itens=LLM_CACHE_MAX_ITENS)
+
+
+def _chave_resposta(llm: str, prompt: str, amostra: int = 0) -> str:
+    # A primeira amostra usa a chave normal; as demais são respostas novas
+    extra = (amostra,) if amostra else ()
+    if llm == "chatgpt":
+        return chave_cache("chatgpt", CHATGPT_MODELO, prompt, CHATGPT_PARAMS, *extra)
+    return chave_cache("gemini", GEMINI_MODELO, prompt, GEMINI_PARAMS, *extra)
 
-    response = await client.chat.completions.create(
-        model="gpt-4o-mini",  # Usa modelo mais barato para testes
-        messages=[
-            {"role": "user", "content": prompt}
-        ],
-        max_tokens=500,
-        temperature=0.7
+
+async def testar_chatgpt(prompt: str, usar_cache: bool = True, amostra: int = 0) -> str:
+    """
+    Testa um prompt no ChatGPT.
+    """
+    cache = _cache_respostas()
+    chave = _chave_resposta("chatgpt", prompt, amostra)
+
+    if usar_cache:
+        resposta = cache.get(chave)
+        if resposta is not None:
+            return resposta
+
+    # Retentativas ficam com o limitador, não com o SDK
+    client = get_openai().with_options(max_retries=0)
+
+    response = await com_retentativas(
+        lambda: client.chat.completions.create(
+            model=CHATGPT_MODELO,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            **CHATGPT_PARAMS
+        ),
+        get_limitador("chatgpt", CHATGPT_MODELO)
     )
 
-    return response.choices[0].message.content
+    resposta = response.choices[0].message.content
+    # Grava mesmo quando o cache foi ignorado, para as próximas execuções
+    cache.set(chave, resposta)
 
+    return resposta
 
-async def testar_gemini(prompt: str) -> str:
+
+async def testar_gemini(prompt: str, usar_cache: bool = True, amostra: int = 0) -> str:
     """
     Testa um prompt no Google Gemini.
     """
     if not GOOGLE_API_KEY:
-        return "API Key do Gemini não configurada"
+        raise ValueError("API Key do Gemini não configurada")
+
+    cache = _cache_respostas()
+    chave = _chave_resposta("gemini", prompt, amostra)
 
-    genai.configure(api_key=GOOGLE_API_KEY)
-    model = genai.GenerativeModel('gemini-pro')
+    if usar_cache:
+        resposta = cache.get(chave)
+        if resposta is not None:
+            return resposta
 
-    response = await asyncio.to_thread(
-        model.generate_content,
-        prompt
+    resposta = await com_retentativas(
+        lambda: get_gemini().gerar(prompt, modelo=GEMINI_MODELO, config=GEMINI_PARAMS or None),
+        get_limitador("gemini", GEMINI_MODELO)
     )
+    cache.set(chave, resposta)
+
+    return resposta
+
+
+class LeituraParcial:
+    """
+    Acumula uma resposta em streaming e decide quando parar de ler.
+    """
+
+    def __init__(self, matcher: MentionMatcher, empresa: str, limite_tokens: int):
+        self.empresa = empresa
+        self.limite_tokens = limite_tokens
+        self.varredura: Varredura = matcher.varredura()
+        self.partes: list = []
+        self.tokens = 0
+        self.token_mencao: Optional[int] = None
+        self.interrompido = False
+        # (caracteres acumulados, tokens acumulados) ao fim de cada pedaço
+        self._fronteiras: list = []
+        self._caracteres = 0
+
+    def alimentar(self, texto: str, tokens: int = 1) -> bool:
+        """Consome um pedaço da resposta; retorna True quando pode parar."""
+        self.partes.append(texto)
+        self.tokens += tokens
+        self._caracteres += len(texto)
+        self._fronteiras.append((self._caracteres, self.tokens))
+
+        self._registrar_mencao(self.varredura.alimentar(texto))
+
+        if self.token_mencao is not None or self.tokens >= self.limite_tokens:
+            self.interrompido = True
+            return True
+        return False
+
+    def finalizar(self) -> "LeituraParcial":
+        self._registrar_mencao(self.varredura.finalizar())
+        return self
+
+    def _registrar_mencao(self, ocorrencias: list) -> None:
+        if self.token_mencao is not None:
+            return
+
+        for oc in ocorrencias:
+            if oc.entidade == self.empresa:
+                # Token em que a menção começa (pode ser um pedaço anterior)
+                i = bisect_right(self._fronteiras, (oc.inicio, float("inf")))
+                self.token_mencao = self._fronteiras[i - 1][1] if i else 0
+                return
+
+    def posicoes(self) -> dict:
+        return self.varredura.posicoes()
+
+    @property
+    def texto(self) -> str:
+        return "".join(self.partes)
+
+
+async def testar_chatgpt_mencao(
+    prompt: str,
+    matcher: MentionMatcher,
+    empresa: str,
+    limite_tokens: int
+) -> LeituraParcial:
+    """
+    Lê a resposta do ChatGPT em streaming até a primeira menção à marca.
+    """
+    client = get_openai().with_options(max_retries=0)
+
+    async def ler() -> LeituraParcial:
+        leitura = LeituraParcial(matcher, empresa, limite_tokens)
+        stream = await client.chat.completions.create(
+            model=CHATGPT_MODELO,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=limite_tokens,
+            temperature=CHATGPT_PARAMS["temperature"],
+            stream=True
+        )
+
+        try:
+            # Cada chunk do streaming da OpenAI carrega ~1 token
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if leitura.alimentar(chunk.choices[0].delta.content):
+                        break
+        finally:
+            # Fecha a conexão: a OpenAI para de gerar (e de cobrar) tokens
+            await stream.close()
+
+        return leitura.finalizar()
+
+    return await com_retentativas(ler, get_limitador("chatgpt", CHATGPT_MODELO))
+
+
+async def testar_gemini_mencao(
+    prompt: str,
+    matcher: MentionMatcher,
+    empresa: str,
+    limite_tokens: int
+) -> LeituraParcial:
+    """
+    Lê a resposta do Gemini em streaming até a primeira menção à marca.
+    """
+    if not GOOGLE_API_KEY:
+        raise ValueError("API Key do Gemini não configurada")
+
+    config = {**GEMINI_PARAMS, "maxOutputTokens": limite_tokens}
+
+    async def ler() -> LeituraParcial:
+        leitura = LeituraParcial(matcher, empresa, limite_tokens)
+
+        async with get_gemini().stream(prompt, modelo=GEMINI_MODELO, config=config) as eventos:
+            async with aclosing(eventos):
+                async for evento in eventos:
+                    candidatos = evento.get("candidates") or [{}]
+                    partes = candidatos[0].get("content", {}).get("parts", [])
+                    texto = "".join(p.get("text", "") for p in partes)
+
+                    # O Gemini informa o total acumulado de tokens gerados
+                    total = evento.get("usageMetadata", {}).get("candidatesTokenCount")
+                    tokens = total - leitura.tokens if total else len(texto) // 4 + 1
+
+                    if texto and leitura.alimentar(texto, tokens=max(tokens, 0)):
+                        break
+
+        return leitura.finalizar()
+
+    return await com_retentativas(ler, get_limitador("gemini", GEMINI_MODELO))
+
 
-    return response.text
+# Provedores com modo streaming de menção
+STREAMING = {
+    "chatgpt": testar_chatgpt_mencao,
+    "gemini": testar_gemini_mencao,
+}
 
 
 async def testar_perplexity(prompt: str) -> str:
@@ -1,11 +1,18 @@
 from .forms import nova_analise_form
-from .resultado import resultado_diagnostico_widget, score_visibilidade_widget
+from .resultado import (
+    resultado_diagnostico_widget,
+    score_visibilidade_widget,
+    progresso_visibilidade_widget
+)
 from .prompts_list import prompts_list_widget, prompt_card_widget
+from .ao_vivo import CardAoVivo
 
 __all__ = [
     "nova_analise_form",
     "resultado_diagnostico_widget",
     "score_visibilidade_widget",
+    "progresso_visibilidade_widget",
     "prompts_list_widget",
-    "prompt_card_widget"
+    "prompt_card_widget",
+    "CardAoVivo"
 ]
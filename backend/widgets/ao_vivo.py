@@ -0,0 +1,68 @@
+"""
+📡 Card ao vivo: widget atualizado em tempo real na thread do ChatKit
+"""
+
+import asyncio
+
+
+class CardAoVivo:
+    """
+    Widget atualizado em tempo real na thread do ChatKit.
+
+    As atualizações entram numa fila consumida por `stream_widget`; quando
+    várias chegam juntas, só a mais recente é enviada. Sem contexto do
+    ChatKit (ex: tool chamada fora do chat) as atualizações são ignoradas.
+    """
+
+    _FIM = object()
+
+    def __init__(self, agent_context):
+        self._fila: asyncio.Queue = asyncio.Queue()
+        self._task = None
+        self._atualizado = False
+
+        stream_widget = getattr(agent_context, "stream_widget", None)
+        if stream_widget is not None:
+            self._task = asyncio.create_task(stream_widget(self._widgets()))
+
+    async def _widgets(self):
+        fim = False
+        while not fim:
+            widget = await self._fila.get()
+            if widget is self._FIM:
+                return
+
+            # Pula para a atualização mais recente, sem perder a última antes do fim
+            while not self._fila.empty():
+                proximo = self._fila.get_nowait()
+                if proximo is self._FIM:
+                    fim = True
+                    break
+                widget = proximo
+
+            yield widget
+
+    def atualizar(self, widget) -> None:
+        if self._task is not None:
+            self._atualizado = True
+            self._fila.put_nowait(widget)
+
+    async def encerrar(self) -> None:
+        """
+        Envia a última atualização e termina o stream. Nunca levanta erro
+        do stream: costuma ser chamado num `finally`, e não pode esconder
+        a exceção original.
+        """
+        if self._task is None:
+            return
+
+        task, self._task = self._task, None
+        if self._atualizado:
+            self._fila.put_nowait(self._FIM)
+        else:
+            # Nada enviado: um gerador vazio faria o stream_widget falhar
+            task.cancel()
+
+        await asyncio.wait([task])
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ Erro no card ao vivo: {task.exception()}")
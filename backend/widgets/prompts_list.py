@@ -11,14 +11,20 @@ from chatkit.widgets import (
 )
 
 
-def prompts_list_widget(prompts: list, categoria: str = None) -> Card:
+def prompts_list_widget(prompts: list, categoria: str = None, gerando: bool = False) -> Card:
     """
     Lista de prompts com opção de filtrar por categoria.
+
+    Com `gerando=True` é a versão parcial, mostrada ao vivo enquanto as
+    categorias chegam (sem os botões de ação).
     """
     # Filtra por categoria se especificado
     if categoria:
         prompts_filtrados = [p for p in prompts if p.get("categoria") == categoria]
         titulo = f"📋 Prompts {categoria} ({len(prompts_filtrados)})"
+    elif gerando:
+        prompts_filtrados = prompts
+        titulo = f"⏳ Gerando prompts GEO... ({len(prompts)}/20)"
     else:
         prompts_filtrados = prompts
         titulo = f"📋 20 Prompts GEO Gerados"
@@ -57,6 +63,9 @@ def prompts_list_widget(prompts: list, categoria: str = None) -> Card:
                 md_content += f"   *Persona: {persona}*\n"
             md_content += "\n"
 
+    if gerando:
+        return Card(children=[Markdown(md_content)])
+
     return Card(
         children=[
             Markdown(md_content)
@@ -87,20 +87,32 @@ def score_visibilidade_widget(resultados: dict) -> Card:
     for llm, dados in resultados.get("resultados_por_llm", {}).items():
         mencoes = dados.get("mencoes", 0)
         total = dados.get("total", 5)
+        medidos = dados.get("medidos", total)
+        nao_medidos = dados.get("nao_medidos", total - medidos)
         llm_score = dados.get("score", 0)
-        llm_details += f"\n| {llm.upper()} | {mencoes}/{total} | {llm_score}% |"
+        llm_details += f"\n| {llm.upper()} | {mencoes}/{medidos} | {nao_medidos} | {llm_score}% |"
+
+    # Intervalo de confiança (modo amostragem)
+    amostragem = resultados.get("amostragem")
+    intervalo = ""
+    if amostragem:
+        ic = amostragem.get("intervalo_confianca", {})
+        intervalo = (
+            f"\n**Intervalo de confiança (95%):** {ic.get('inferior', 0)}% – {ic.get('superior', 100)}% "
+            f"({amostragem.get('amostras_por_prompt', 1)} amostras por prompt)\n"
+        )
 
     md_content = f"""
 ## {emoji} Score de Visibilidade: {score}%
 
 **Classificação:** {classificacao.upper()}
-
+{intervalo}
 {mensagem}
 
 ### Resultados por LLM
 
-| LLM | Menções | Score |
-|-----|---------|-------|{llm_details}
+| LLM | Menções | Não medidos | Score |
+|-----|---------|-------------|-------|{llm_details}
 
 ---
 
@@ -108,6 +120,7 @@ def score_visibilidade_widget(resultados: dict) -> Card:
 - Testamos seus prompts em cada LLM
 - Verificamos se sua empresa foi mencionada
 - Score = % de vezes que você apareceu
+- Testes que falharam (ex: limite de uso da API) ficam fora do score
 """
 
     return Card(
@@ -126,6 +139,41 @@ def score_visibilidade_widget(resultados: dict) -> Card:
     )
 
 
+def progresso_visibilidade_widget(progresso: dict) -> Card:
+    """
+    Card ao vivo com o teste de visibilidade em andamento.
+    """
+    concluidos = progresso.get("concluidos", 0)
+    total = progresso.get("total", 0)
+    score = progresso.get("score_parcial", 0)
+
+    llm_details = ""
+    for llm, dados in progresso.get("por_llm", {}).items():
+        mencoes = dados.get("mencoes", 0)
+        medidos = dados.get("medidos", 0)
+        nao_medidos = dados.get("nao_medidos", 0)
+        llm_total = dados.get("total", 0)
+        feitos = medidos + nao_medidos
+        llm_details += f"\n| {llm.upper()} | {feitos}/{llm_total} | {mencoes}/{medidos} | {nao_medidos} |"
+
+    md_content = f"""
+## ⏳ Testando visibilidade de {progresso.get("empresa", "")}
+
+**Progresso:** {concluidos}/{total} testes
+**Score parcial:** {score}%
+
+| LLM | Testados | Menções | Não medidos |
+|-----|----------|---------|-------------|{llm_details}
+"""
+
+    return Card(
+        children=[
+            Markdown(md_content)
+        ],
+        status="info"
+    )
+
+
 def dicas_melhoria_widget(score: float) -> Card:
     """
     Card com dicas para melhorar visibilidade.
@@ -0,0 +1,27 @@
+-- Salva uma análise e seus prompts numa transação só (um round trip).
+-- Usada por SupabaseStore.save_analise via RPC; sem ela o store cai
+-- para dois inserts em lote.
+--
+-- p_analise: objeto com as colunas de analises (thread_id, empresa, site,
+--            dados, status, created_at)
+-- p_prompts: array de objetos com as colunas de prompts (sem analise_id)
+
+create or replace function salvar_analise(p_analise jsonb, p_prompts jsonb)
+returns uuid
+language plpgsql
+as $$
+declare
+  novo_id uuid;
+begin
+  insert into analises (thread_id, empresa, site, dados, status, created_at)
+  select thread_id, empresa, site, dados, status, created_at
+  from jsonb_populate_record(null::analises, p_analise)
+  returning id into novo_id;
+
+  insert into prompts (analise_id, ordem, texto, categoria, intent, persona, formato_esperado)
+  select novo_id, ordem, texto, categoria, intent, persona, formato_esperado
+  from jsonb_populate_recordset(null::prompts, coalesce(p_prompts, '[]'::jsonb));
+
+  return novo_id;
+end;
+$$;
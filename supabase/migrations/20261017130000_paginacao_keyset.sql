@@ -0,0 +1,16 @@
+-- Índices da paginação keyset em (created_at, id) usada por
+-- SupabaseStore.list_threads_pagina e get_messages_pagina.
+--
+-- Cada página é um "created_at <= c AND (created_at < c OR
+-- (created_at = c AND id < i)) ORDER BY created_at DESC, id DESC LIMIT n":
+-- com estes índices o Postgres desce direto à posição do cursor e lê só
+-- n + 1 linhas, seja a primeira página ou a milésima.
+
+create index if not exists messages_thread_keyset_idx
+  on messages (thread_id, created_at desc, id desc);
+
+create index if not exists threads_keyset_idx
+  on threads (created_at desc, id desc);
+
+create index if not exists threads_user_keyset_idx
+  on threads (user_id, created_at desc, id desc);